@@ -0,0 +1,31 @@
+"""
+Migration to add schemas.updated_at
+
+Safe to run more than once: the column is only added if it is missing.
+Run with: python add_schema_updated_at.py
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import inspect, text
+from flask_backend.app import create_app
+from flask_backend.app.extensions import db
+
+app = create_app()
+
+with app.app_context():
+    columns = {c['name'] for c in inspect(db.engine).get_columns('schemas')}
+
+    if 'updated_at' in columns:
+        print("✅ schemas.updated_at already exists, nothing to do")
+    else:
+        print("Adding schemas.updated_at...")
+        column_type = db.DateTime().compile(dialect=db.engine.dialect)
+        with db.engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE schemas ADD COLUMN updated_at {column_type}"))
+            # Existing schemas start out as last updated when they were created
+            conn.execute(text("UPDATE schemas SET updated_at = created_at WHERE updated_at IS NULL"))
+        print("✅ schemas.updated_at added successfully!")
@@ -2,13 +2,15 @@ import os
 from flask import Flask, jsonify
 from flask_cors import CORS
 from .config import get_config
-from .extensions import db, migrate, jwt, ma
+from .extensions import db, migrate, jwt, ma, compress
+from .json_provider import OrjsonProvider
 def create_app():
     env = os.getenv("FLASK_ENV", "development")
     config = get_config(env)
 
     app = Flask(__name__)
     app.config.from_object(config)
+    app.json = OrjsonProvider(app)
     
     # Disable strict slashes to prevent redirects
     app.url_map.strict_slashes = False
@@ -26,6 +28,7 @@ def create_app():
     migrate.init_app(app, db)
     jwt.init_app(app)
     ma.init_app(app)
+    compress.init_app(app)
 
     # JWT error handlers
     @jwt.expired_token_loader
@@ -34,14 +37,20 @@ def create_app():
 
     @jwt.invalid_token_loader
     def invalid_token_callback(error):
-        print(f"Invalid token: {error}")
+        app.logger.info("Invalid token: %s", error)
         return jsonify({"error": f"invalid token: {error}"}), 401
 
     @jwt.unauthorized_loader
     def missing_token_callback(error):
-        print(f"Missing token: {error}")
+        app.logger.info("Missing token: %s", error)
         return jsonify({"error": "missing authorization header"}), 401
 
+    # Body over MAX_CONTENT_LENGTH: same JSON error as the upload routes
+    @app.errorhandler(413)
+    def request_too_large(error):
+        max_size = app.config["MAX_CONTENT_LENGTH"]
+        return jsonify({"error": f"File too large (max {max_size} bytes)"}), 413
+
     # Import models to ensure they're registered
     from . import models
 
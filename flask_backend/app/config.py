@@ -12,6 +12,16 @@ class BaseConfig:
     CORS_HEADERS = 'Content-Type'
     CORS_ALLOW_HEADERS = ['Content-Type', 'Authorization']
     CORS_SUPPORTS_CREDENTIALS = True
+    # Response compression (Flask-Compress), brotli preferred over gzip
+    COMPRESS_ALGORITHM = ['br', 'gzip']
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_LEVEL = 4
+    COMPRESS_BR_LEVEL = 4
+    # Largest accepted file upload (bytes); checked against Content-Length
+    MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", 100 * 1024 * 1024))
+    # Werkzeug stops reading any request body past this size (chunked ones
+    # included) and answers 413, so oversize uploads never reach the disk
+    MAX_CONTENT_LENGTH = MAX_UPLOAD_SIZE
 
 
 class DevelopmentConfig(BaseConfig):
@@ -22,6 +32,11 @@ class DevelopmentConfig(BaseConfig):
 class ProductionConfig(BaseConfig):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
+    # psycopg2: send executemany() INSERTs as multi-row VALUES batches
+    SQLALCHEMY_ENGINE_OPTIONS = (
+        {"executemany_mode": "values_plus_batch"}
+        if (SQLALCHEMY_DATABASE_URI or "").startswith("postgresql") else {}
+    )
 
 
 def get_config(env: str):
@@ -0,0 +1,32 @@
+"""
+orjson-backed JSON provider
+Replaces Flask's stdlib json for request parsing and jsonify()
+"""
+import orjson
+from flask.json.provider import JSONProvider, DefaultJSONProvider
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider using orjson
+
+    Responses are built straight from the bytes orjson produces. Datetimes are
+    passed through to Flask's default handler so they serialize exactly as
+    before; the same handler covers Decimal, UUID and dataclasses.
+    """
+
+    mimetype = "application/json"
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self._dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps(obj), mimetype=self.mimetype)
+
+    def _dumps(self, obj) -> bytes:
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=self.option)
@@ -1,4 +1,7 @@
 from datetime import datetime
+from functools import cached_property
+from dateutil import parser as date_parser
+from sqlalchemy import event
 from .extensions import db
 
 
@@ -47,6 +50,7 @@ class SchemaModel(db.Model):
     schema_json = db.Column(db.JSON, nullable=True)  # Kept for backward compatibility
     created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Bumped on any field change
     
     # Relationships
     fields = db.relationship('SchemaField', backref='schema', lazy=True, cascade="all, delete-orphan")
@@ -54,6 +58,15 @@ class SchemaModel(db.Model):
     change_logs = db.relationship('ChangeLog', backref='schema', lazy=True)
     parent = db.relationship('SchemaModel', remote_side=[id], backref='children')
     
+    @cached_property
+    def active_fields(self):
+        """Non-deleted fields, memoized until the instance is expired or its fields change"""
+        return [f for f in self.fields if not f.is_deleted]
+    
+    def invalidate_active_fields(self):
+        """Drop the memoized active_fields list"""
+        self.__dict__.pop('active_fields', None)
+    
     def to_dict(self, include_fields=True):
         result = {
             "id": self.id,
@@ -64,7 +77,8 @@ class SchemaModel(db.Model):
             "allow_additional_fields": self.allow_additional_fields,
             "is_active": self.is_active,
             "created_by": self.created_by,
-            "created_at": self.created_at.isoformat() if self.created_at else None
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
         if include_fields:
             result["fields"] = [field.to_dict() for field in self.fields]
@@ -108,6 +122,32 @@ class SchemaField(db.Model):
         }
 
 
+# Keep SchemaModel.active_fields in step with the session: expiring/refreshing
+# the schema (e.g. on commit), changing its fields collection or soft-deleting
+# a field drops the memoized list
+@event.listens_for(SchemaModel, 'expire')
+def _schema_expired(target, attrs):
+    target.invalidate_active_fields()
+
+
+@event.listens_for(SchemaModel, 'refresh')
+def _schema_refreshed(target, context, attrs):
+    target.invalidate_active_fields()
+
+
+@event.listens_for(SchemaModel.fields, 'append')
+@event.listens_for(SchemaModel.fields, 'remove')
+def _schema_fields_changed(target, value, initiator):
+    target.invalidate_active_fields()
+
+
+@event.listens_for(SchemaField.is_deleted, 'set')
+def _field_deleted_changed(target, value, oldvalue, initiator):
+    schema = target.__dict__.get('schema')
+    if schema is not None:
+        schema.invalidate_active_fields()
+
+
 class MetadataRecord(db.Model):
     """Metadata records using dynamic schema"""
     __tablename__ = "metadata_records"
@@ -140,6 +180,35 @@ class MetadataRecord(db.Model):
         return result
 
 
+def _parse_date(value):
+    if isinstance(value, str):
+        return date_parser.parse(value)
+    return value
+
+
+def _as_is(value):
+    return value
+
+
+# Field type -> (value column, converter), dispatched once per value instead
+# of walking an if/elif chain of type names
+VALUE_COLUMNS = {
+    'string': ('value_text', str),
+    'integer': ('value_int', int),
+    'float': ('value_float', float),
+    'boolean': ('value_bool', bool),
+    'date': ('value_date', _parse_date),
+    'json': ('value_json', _as_is),
+    'array': ('value_json', _as_is),
+    'object': ('value_json', _as_is),
+}
+
+# Every value column cleared
+EMPTY_VALUE_COLUMNS = dict.fromkeys(
+    ('value_text', 'value_int', 'value_float', 'value_bool', 'value_date', 'value_json')
+)
+
+
 class FieldValue(db.Model):
     """EAV (Entity-Attribute-Value) pattern for dynamic field storage"""
     __tablename__ = "field_values"
@@ -165,51 +234,35 @@ class FieldValue(db.Model):
     def get_value(self):
         """Get the value based on field type"""
         field_type = self.schema_field.field_type
-        if field_type == 'string':
-            return self.value_text
-        elif field_type == 'integer':
-            return self.value_int
-        elif field_type == 'float':
-            return self.value_float
-        elif field_type == 'boolean':
-            return self.value_bool
-        elif field_type == 'date':
+        if field_type == 'date':
             return self.value_date.isoformat() if self.value_date else None
-        elif field_type in ('json', 'array', 'object'):
-            return self.value_json
-        return None
+        target = VALUE_COLUMNS.get(field_type)
+        return getattr(self, target[0]) if target else None
     
-    def set_value(self, value):
-        """Set the value based on field type"""
-        field_type = self.schema_field.field_type
-        # Clear all values first
-        self.value_text = None
-        self.value_int = None
-        self.value_float = None
-        self.value_bool = None
-        self.value_date = None
-        self.value_json = None
+    @staticmethod
+    def value_columns(field_type, value):
+        """
+        Map a value onto the type-specific value columns
         
-        # Set the appropriate value
+        Returns a dict with every value_* column, only the one matching
+        field_type set. Used by set_value and by bulk inserts that build
+        FieldValue rows without ORM objects.
+        """
+        columns = EMPTY_VALUE_COLUMNS.copy()
         if value is None:
-            return
+            return columns
         
-        if field_type == 'string':
-            self.value_text = str(value)
-        elif field_type == 'integer':
-            self.value_int = int(value)
-        elif field_type == 'float':
-            self.value_float = float(value)
-        elif field_type == 'boolean':
-            self.value_bool = bool(value)
-        elif field_type == 'date':
-            if isinstance(value, str):
-                from dateutil import parser
-                self.value_date = parser.parse(value)
-            else:
-                self.value_date = value
-        elif field_type in ('json', 'array', 'object'):
-            self.value_json = value
+        target = VALUE_COLUMNS.get(field_type)
+        if target is not None:
+            column, convert = target
+            columns[column] = convert(value)
+        return columns
+    
+    def set_value(self, value):
+        """Set the value based on field type"""
+        # Clears all value columns and sets the one for the field type
+        for column, column_value in self.value_columns(self.schema_field.field_type, value).items():
+            setattr(self, column, column_value)
 
 
 class ChangeLog(db.Model):
@@ -1,9 +1,11 @@
+import logging
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..models import AssetType
 from ..extensions import db
 
 asset_types_bp = Blueprint("asset_types", __name__)
+logger = logging.getLogger(__name__)
 
 
 @asset_types_bp.route("/", methods=["GET"])
@@ -19,11 +21,11 @@ def create_asset_type():
         from flask_jwt_extended import get_jwt
         claims = get_jwt()
         user_id = get_jwt_identity()
-        print(f"User ID: {user_id}, Claims: {claims}")
+        logger.debug("User ID: %s, Claims: %s", user_id, claims)
         if claims.get("role") != "admin":
             return jsonify({"error": "admin required"}), 403
         data = request.get_json() or {}
-        print(f"Request data: {data}")
+        logger.debug("Request data: %s", data)
         name = data.get("name")
         if not name:
             return jsonify({"error": "name required"}), 400
@@ -34,9 +36,7 @@ def create_asset_type():
         db.session.commit()
         return jsonify({"id": t.id, "name": t.name}), 201
     except Exception as e:
-        print(f"Error creating asset type: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error creating asset type: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
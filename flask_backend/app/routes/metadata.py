@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert
 from ..models import MetadataRecord, SchemaModel, SchemaField, FieldValue
 from ..extensions import db
-from ..services.schema_matcher import find_best_schema_from_keys, create_schema_from_metadata
+from ..services.schema_matcher import find_best_schema_from_keys, create_schema_from_metadata, get_candidate_schemas
 from ..services.schema_manager import SchemaManager
 from ..services.metadata_catalog import MetadataCatalog
 
@@ -70,29 +71,21 @@ def suggest_schemas():
     if not incoming_keys:
         return jsonify({"error": "values or metadata_json required"}), 400
     
-    # Get candidate schemas (optionally filter by asset type)
-    q = SchemaModel.query
-    if asset_type_id:
-        q = q.filter(SchemaModel.asset_type_id == asset_type_id)
-    schemas = q.all()
+    # Get candidate schemas (optionally filter by asset type); briefly cached
+    # per asset type so repeated suggestions skip the schema query
+    candidates = get_candidate_schemas(asset_type_id)
     
-    # Score by overlapping field names
-    def score_schema(s: SchemaModel) -> float:
-        field_names = {f.field_name for f in s.fields if not f.is_deleted}
-        common = field_names.intersection(incoming_keys)
-        return len(common) / len(incoming_keys) if incoming_keys else 0.0
+    # Score by overlapping field names, building the incoming key set once
+    incoming = frozenset(incoming_keys)
     
-    ranked_schemas = [
-        {
-            "id": s.id,
-            "name": s.name,
-            "version": s.version,
-            "asset_type_id": s.asset_type_id,
-            "fields": [f.field_name for f in s.fields if not f.is_deleted],
-            "match_score": round(score_schema(s) * 100, 1)
-        }
-        for s in schemas
-    ]
+    ranked_schemas = []
+    for c in candidates:
+        common = incoming.intersection(c["fields"])
+        ranked_schemas.append({
+            **c,
+            "fields": list(c["fields"]),
+            "match_score": round(len(common) / len(incoming) * 100, 1)
+        })
     ranked_schemas.sort(key=lambda x: x["match_score"], reverse=True)
     
     return jsonify({
@@ -179,24 +172,25 @@ def create_metadata():
     # Persist field values
     # Build mapping of field_name -> SchemaField
     fields = {f.field_name: f for f in SchemaField.query.filter_by(schema_id=schema.id, is_deleted=False).all()}
-    for k, v in values.items():
-        if k not in fields:
-            if schema.allow_additional_fields:
-                # Skip unknown fields (or could add as new field via manager)
-                continue
-            else:
-                db.session.rollback()
-                return jsonify({"error": f"field '{k}' not defined in schema"}), 400
+    # Unknown fields are skipped (or could add as new field via manager)
+    # unless the schema is closed; set ops on the key views run in C
+    unknown = values.keys() - fields.keys()
+    if unknown and not schema.allow_additional_fields:
+        db.session.rollback()
+        k = next(k for k in values if k in unknown)
+        return jsonify({"error": f"field '{k}' not defined in schema"}), 400
+
+    value_rows = []
+    for k in values.keys() & fields.keys():
         f = fields[k]
-        fv = FieldValue(record_id=r.id, schema_field_id=f.id)
-        # Temporarily set field type for set_value convenience
-        f_type_backup = f.field_type
-        try:
-            fv.schema_field = f
-            fv.set_value(v)
-        finally:
-            f.field_type = f_type_backup
-        db.session.add(fv)
+        row = FieldValue.value_columns(f.field_type, values[k])
+        row["record_id"] = r.id
+        row["schema_field_id"] = f.id
+        value_rows.append(row)
+
+    # One executemany INSERT for all values
+    if value_rows:
+        db.session.execute(insert(FieldValue), value_rows)
 
     db.session.commit()
     return jsonify(r.to_dict(include_values=True)), 201
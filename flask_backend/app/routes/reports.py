@@ -2,8 +2,9 @@
 Reports API Routes
 """
 import os
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, request, jsonify, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from werkzeug.utils import secure_filename
 from ..models import ReportTemplate, ReportExecution, User, SchemaModel
 from ..extensions import db
 from ..services.report_generator import ReportGenerator
@@ -194,6 +195,34 @@ def generate_adhoc_report():
         return jsonify({'error': str(e)}), 500
 
 
+@reports_bp.route('/generate/adhoc/csv', methods=['POST'])
+@jwt_required()
+def stream_adhoc_csv():
+    """Stream an ad-hoc CSV report straight to the client (no stored file)"""
+    data = request.get_json()
+    
+    schema_id = data.get('schema_id')
+    query_config = data.get('query_config', {})
+    report_name = data.get('name', 'Ad-hoc Report')
+    
+    if not schema_id:
+        return jsonify({'error': 'schema_id is required'}), 400
+    
+    try:
+        chunks = report_gen.stream_adhoc_csv(schema_id, query_config)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    # The name is user input: reduce it to a safe ASCII file name and let
+    # Werkzeug quote the header parameter
+    filename = f"{secure_filename(report_name) or 'report'}.csv"
+    response = Response(chunks, mimetype='text/csv')
+    response.headers.set('Content-Disposition', 'attachment', filename=filename)
+    return response
+
+
 @reports_bp.route('/executions', methods=['GET'])
 @jwt_required()
 def list_executions():
@@ -245,18 +274,23 @@ def download_report(execution_id):
     if execution.status != 'completed':
         return jsonify({'error': 'Report not ready yet'}), 400
     
-    if not execution.file_path or not os.path.exists(execution.file_path):
+    if not execution.file_path:
         return jsonify({'error': 'File not found'}), 404
     
     # Determine mimetype
     mimetype = 'text/csv' if execution.format == 'csv' else 'application/pdf'
     
-    return send_file(
-        execution.file_path,
-        as_attachment=True,
-        download_name=os.path.basename(execution.file_path),
-        mimetype=mimetype
-    )
+    # send_file stats the file itself; a missing file raises instead of
+    # being checked with a separate exists() call
+    try:
+        return send_file(
+            execution.file_path,
+            as_attachment=True,
+            download_name=os.path.basename(execution.file_path),
+            mimetype=mimetype
+        )
+    except FileNotFoundError:
+        return jsonify({'error': 'File not found'}), 404
 
 
 @reports_bp.route('/executions/<int:execution_id>', methods=['DELETE'])
@@ -271,11 +305,11 @@ def delete_execution(execution_id):
     if execution.user_id != user_id and user.role != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    # Delete file if exists
-    if execution.file_path and os.path.exists(execution.file_path):
+    # Delete file if exists (a missing file just raises, no separate exists check)
+    if execution.file_path:
         try:
             os.remove(execution.file_path)
-        except:
+        except OSError:
             pass
     
     db.session.delete(execution)
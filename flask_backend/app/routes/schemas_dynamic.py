@@ -1,9 +1,11 @@
 """
 Dynamic Schema Routes - Enhanced endpoints for dynamic schema management
 """
-from flask import Blueprint, request, jsonify
+import logging
+from flask import Blueprint, request, jsonify, make_response
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from ..models import SchemaModel, SchemaField, AssetType
+from sqlalchemy.orm import selectinload
+from ..models import SchemaModel, SchemaField, AssetType, MetadataRecord
 from ..extensions import db
 from ..services.schema_manager import SchemaManager
 from ..services.schema_version_control import SchemaVersionControl
@@ -11,6 +13,7 @@ from ..services.migration_generator import MigrationGenerator, ImpactAnalyzer
 from ..services.metadata_catalog import MetadataCatalog
 
 schemas_bp = Blueprint("schemas", __name__)
+logger = logging.getLogger(__name__)
 
 # Initialize services
 schema_manager = SchemaManager()
@@ -20,13 +23,39 @@ impact_analyzer = ImpactAnalyzer()
 catalog = MetadataCatalog()
 
 
+def _schema_etag(schema, *parts) -> str:
+    """Build an ETag for a read-only schema view; changes whenever the schema is updated"""
+    stamp = schema.updated_at or schema.created_at
+    version = int(stamp.timestamp() * 1000000) if stamp else 0
+    return "-".join(str(p) for p in (schema.id, version) + parts)
+
+
+def _not_modified(etag: str):
+    """Return a 304 response if the client already has this ETag, else None"""
+    if request.if_none_match.contains_weak(etag):
+        response = make_response("", 304)
+        response.set_etag(etag, weak=True)
+        return response
+    return None
+
+
+def _with_etag(response, etag: str):
+    """Attach ETag and caching headers to a response"""
+    response.set_etag(etag, weak=True)
+    # Always revalidate: a cached copy is only reused after a 304, so edits
+    # show up on the next fetch
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
 @schemas_bp.route("/", methods=["GET"])
 def list_schemas():
     """List all schemas with optional filtering"""
     asset_type_id = request.args.get("asset_type_id", type=int)
     active_only = request.args.get("active_only", "true").lower() == "true"
     
-    query = SchemaModel.query
+    # Fields for every schema come back in one SELECT ... WHERE schema_id IN (...)
+    query = SchemaModel.query.options(selectinload(SchemaModel.fields))
     
     if asset_type_id:
         query = query.filter_by(asset_type_id=asset_type_id)
@@ -34,6 +63,7 @@ def list_schemas():
         query = query.filter_by(is_active=True)
     
     schemas = query.order_by(SchemaModel.version.desc()).all()
+    statistics = catalog.get_schema_statistics_bulk([s.id for s in schemas])
     
     result = []
     for s in schemas:
@@ -47,7 +77,7 @@ def list_schemas():
         schema_dict["created_by_name"] = user_name
         
         # Add statistics
-        schema_dict["statistics"] = catalog.get_schema_statistics(s.id)
+        schema_dict["statistics"] = statistics[s.id]
         
         result.append(schema_dict)
     
@@ -122,8 +152,8 @@ def compare_schemas():
         return jsonify({"error": "one or both schemas not found"}), 404
     
     # Get fields for both schemas
-    fields1 = {f.field_name: f for f in schema1.fields if not f.is_deleted}
-    fields2 = {f.field_name: f for f in schema2.fields if not f.is_deleted}
+    fields1 = {f.field_name: f for f in schema1.active_fields}
+    fields2 = {f.field_name: f for f in schema2.active_fields}
     
     # Calculate differences
     added_fields = []
@@ -193,10 +223,20 @@ def get_schema(schema_id):
     if not schema:
         return jsonify({"error": "Schema not found"}), 404
     
+    # Record count isn't tracked by updated_at, so fold a fresh count into
+    # the tag (cached statistics may lag behind by up to their TTL)
+    record_count = MetadataRecord.query.filter_by(schema_id=schema_id).count()
+    etag = _schema_etag(schema, record_count)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+    
+    statistics = dict(catalog.get_schema_statistics(schema_id), record_count=record_count)
+    
     schema_dict = schema.to_dict(include_fields=True)
-    schema_dict["statistics"] = catalog.get_schema_statistics(schema_id)
+    schema_dict["statistics"] = statistics
     
-    return jsonify(schema_dict)
+    return _with_etag(jsonify(schema_dict), etag)
 
 
 @schemas_bp.route("/<int:schema_id>/fields", methods=["POST"])
@@ -285,7 +325,7 @@ def modify_field(schema_id, field_name):
         return jsonify({"error": "admin or editor required"}), 403
     
     data = request.get_json() or {}
-    print(f"[MODIFY_FIELD] schema_id={schema_id}, field_name={field_name}, data={data}", flush=True)
+    logger.debug("[MODIFY_FIELD] schema_id=%s, field_name=%s, data=%s", schema_id, field_name, data)
     
     # Accept both frontend and backend key styles
     new_type = data.get("type") or data.get("field_type")
@@ -303,7 +343,7 @@ def modify_field(schema_id, field_name):
             new_constraints=data.get("constraints"),
             new_description=data.get("description")
         )
-        print(f"[MODIFY_FIELD] Success: {field.to_dict()}", flush=True)
+        logger.debug("[MODIFY_FIELD] Success: schema_id=%s, field_name=%s", schema_id, field.field_name)
         
         return jsonify({
             "success": True,
@@ -311,12 +351,10 @@ def modify_field(schema_id, field_name):
         })
         
     except ValueError as e:
-        print(f"[MODIFY_FIELD] ValueError: {str(e)}", flush=True)
+        logger.warning("[MODIFY_FIELD] ValueError: %s", e)
         return jsonify({"error": str(e)}), 400
     except Exception as e:
-        print(f"[MODIFY_FIELD] Exception: {str(e)}", flush=True)
-        import traceback
-        traceback.print_exc()
+        logger.exception("[MODIFY_FIELD] Exception: %s", e)
         return jsonify({"error": f"Failed to modify field: {str(e)}"}), 500
 
 
@@ -362,17 +400,36 @@ def fork_schema(schema_id):
 def list_versions(schema_id):
     """List all versions of a schema"""
     limit = request.args.get("limit", 50, type=int)
+    
+    schema = SchemaModel.query.get(schema_id)
+    if not schema:
+        return jsonify(version_control.list_versions(schema_id, limit=limit))
+    
+    etag = _schema_etag(schema, "versions", limit)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+    
     versions = version_control.list_versions(schema_id, limit=limit)
-    return jsonify(versions)
+    return _with_etag(jsonify(versions), etag)
 
 
 @schemas_bp.route("/<int:schema_id>/versions/<int:version_number>", methods=["GET"])
 def get_version(schema_id, version_number):
     """Get a specific version"""
+    schema = SchemaModel.query.get(schema_id)
+    if not schema:
+        return jsonify({"error": "Version not found"}), 404
+    
+    etag = _schema_etag(schema, "version", version_number)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+    
     version = version_control.get_version(schema_id, version_number)
     if not version:
         return jsonify({"error": "Version not found"}), 404
-    return jsonify(version)
+    return _with_etag(jsonify(version), etag)
 
 
 @schemas_bp.route("/<int:schema_id>/versions/compare", methods=["GET"])
@@ -472,9 +529,18 @@ def get_schema_ddl(schema_id):
     """Get full DDL for current schema"""
     dialect = request.args.get("dialect", "postgresql")
     
+    schema = SchemaModel.query.get(schema_id)
+    if not schema:
+        return jsonify({"error": f"Schema {schema_id} not found"}), 404
+    
+    etag = _schema_etag(schema, "ddl", dialect)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+    
     try:
         ddl = migration_gen.generate_full_schema_ddl(schema_id, dialect)
-        return jsonify({"ddl": ddl})
+        return _with_etag(jsonify({"ddl": ddl}), etag)
     except ValueError as e:
         return jsonify({"error": str(e)}), 404
 
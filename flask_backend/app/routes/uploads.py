@@ -1,8 +1,9 @@
 """
 Data Upload/Import Routes
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import text
 from ..models import SchemaModel, MetadataRecord
 from ..extensions import db
 from ..services.data_import_service import DataImportService
@@ -40,31 +41,13 @@ def parse_data():
     if not schema:
         return jsonify({'error': 'Schema not found'}), 404
     
-    schema_fields = [f.field_name for f in schema.fields if not f.is_deleted]
+    schema_fields, schema_field_defs = import_service.get_schema_fields(schema)
     
     try:
         # Parse data
-        if format_hint == 'auto':
-            detected_format, parsed_data = import_service.auto_parse(content, schema_fields)
-        elif format_hint == 'json':
-            parsed_data = import_service.parse_json(content)
-            detected_format = 'json'
-        elif format_hint in ['csv', 'tsv', 'pipe', 'semicolon']:
-            delimiter = ',' if format_hint == 'csv' else format_hint
-            parsed_data = import_service.parse_csv(content, delimiter)
-            detected_format = format_hint
-        elif format_hint == 'keyvalue':
-            parsed_data = import_service.parse_keyvalue(content)
-            detected_format = 'keyvalue'
-        else:
-            parsed_data = import_service.parse_plain_text(content, schema_fields)
-            detected_format = 'plain'
+        detected_format, parsed_data = import_service.parse_content(content, format_hint, schema_fields)
         
         # Suggest field mapping
-        schema_field_defs = [
-            {'field_name': f.field_name, 'field_type': f.field_type, 'is_required': f.is_required}
-            for f in schema.fields if not f.is_deleted
-        ]
         mapping = import_service.suggest_field_mapping(parsed_data, schema_field_defs)
         
         return jsonify({
@@ -72,7 +55,7 @@ def parse_data():
             'record_count': len(parsed_data),
             'preview': parsed_data[:10],  # First 10 records
             'suggested_mapping': mapping,
-            'data_fields': list(parsed_data[0].keys()) if parsed_data else [],
+            'data_fields': import_service.get_columns(parsed_data),
             'schema_fields': schema_fields,
         })
     except Exception as e:
@@ -112,71 +95,44 @@ def import_data():
     if not schema:
         return jsonify({'error': 'Schema not found'}), 404
     
-    schema_fields = [f.field_name for f in schema.fields if not f.is_deleted]
+    schema_fields, schema_field_defs = import_service.get_schema_fields(schema)
     
     try:
         # Parse data
-        if format_hint == 'auto':
-            detected_format, parsed_data = import_service.auto_parse(content, schema_fields)
-        elif format_hint == 'json':
-            parsed_data = import_service.parse_json(content)
-            detected_format = 'json'
-        elif format_hint in ['csv', 'tsv', 'pipe', 'semicolon']:
-            delimiter = ',' if format_hint == 'csv' else format_hint
-            parsed_data = import_service.parse_csv(content, delimiter)
-            detected_format = format_hint
-        elif format_hint == 'keyvalue':
-            parsed_data = import_service.parse_keyvalue(content)
-            detected_format = 'keyvalue'
-        else:
-            parsed_data = import_service.parse_plain_text(content, schema_fields)
-            detected_format = 'plain'
-        
-        # Apply field mapping
-        if field_mapping:
-            mapped_data = []
-            for record in parsed_data:
-                mapped_record = {}
-                for data_field, value in record.items():
-                    schema_field = field_mapping.get(data_field, data_field)
-                    mapped_record[schema_field] = value
-                mapped_data.append(mapped_record)
-            parsed_data = mapped_data
-        
-        # Validate against schema
-        schema_field_defs = [
-            {'field_name': f.field_name, 'field_type': f.field_type, 'is_required': f.is_required}
-            for f in schema.fields if not f.is_deleted
-        ]
+        detected_format, parsed_data = import_service.parse_content(content, format_hint, schema_fields)
         
+        # Validate against schema; the field mapping is applied while reading
+        # values, so no renamed copy of the data is built
         if not skip_validation:
-            valid_records, errors = import_service.validate_against_schema(parsed_data, schema_field_defs)
+            valid_records, errors = import_service.validate_against_schema(
+                parsed_data, schema_field_defs, field_mapping=field_mapping
+            )
             if errors:
                 return jsonify({
                     'error': 'Validation failed',
                     'validation_errors': errors,
                     'valid_count': len(valid_records),
-                    'invalid_count': len(errors),
+                    # Records that failed; a lower bound if validation was
+                    # truncated at the error cap
+                    'invalid_count': errors.invalid_count,
+                    'truncated': errors.truncated,
                 }), 400
+        elif field_mapping:
+            valid_records = import_service.apply_field_mapping(parsed_data, field_mapping)
         else:
             valid_records = parsed_data
         
-        # Create metadata records
-        created_records = []
-        failed_records = []
+        # Create metadata records in batches, all in one transaction
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute(text('SET CONSTRAINTS ALL DEFERRED'))
+        
+        created_records, failed_records = metadata_service.create_records(
+            schema_id=schema_id,
+            records=valid_records,
+            created_by=user_id
+        )
         
-        for idx, record_data in enumerate(valid_records):
-            try:
-                # Create metadata record
-                record = metadata_service.create_record(
-                    schema_id=schema_id,
-                    name=record_data.get('name', f'Imported Record {idx + 1}'),
-                    field_values=record_data,
-                    created_by=user_id
-                )
-                created_records.append(record.id)
-            except Exception as e:
-                failed_records.append({'index': idx, 'error': str(e)})
+        db.session.commit()
         
         return jsonify({
             'success': True,
@@ -189,6 +145,7 @@ def import_data():
         }), 201
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': f'Import error: {str(e)}'}), 500
 
 
@@ -196,12 +153,17 @@ def import_data():
 @jwt_required()
 def upload_file():
     """
-    Upload a file (CSV, JSON, TXT) and parse
+    Upload a file (CSV, JSON, JSON Lines, TXT) and parse
     
     Form data:
         - file: uploaded file
         - schema_id: target schema
     """
+    # Reject oversize uploads from the header, before the body is parsed
+    max_size = current_app.config['MAX_UPLOAD_SIZE']
+    if request.content_length and request.content_length > max_size:
+        return jsonify({'error': f'File too large (max {max_size} bytes)'}), 413
+    
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
     
@@ -220,13 +182,12 @@ def upload_file():
         return jsonify({'error': 'Schema not found'}), 404
     
     try:
-        # Read file content
-        content = file.read().decode('utf-8-sig')  # Handle BOM
-        
         # Detect format from extension
         filename = file.filename.lower()
         if filename.endswith('.json'):
             format_hint = 'json'
+        elif filename.endswith('.jsonl') or filename.endswith('.ndjson'):
+            format_hint = 'jsonl'
         elif filename.endswith('.csv'):
             format_hint = 'csv'
         elif filename.endswith('.tsv') or filename.endswith('.txt'):
@@ -234,36 +195,29 @@ def upload_file():
         else:
             format_hint = 'auto'
         
-        schema_fields = [f.field_name for f in schema.fields if not f.is_deleted]
+        schema_fields, schema_field_defs = import_service.get_schema_fields(schema)
         
-        # Parse
-        if format_hint == 'auto':
-            detected_format, parsed_data = import_service.auto_parse(content, schema_fields)
-        elif format_hint == 'json':
-            parsed_data = import_service.parse_json(content)
-            detected_format = 'json'
-        elif format_hint in ['csv', 'tsv']:
-            delimiter = ',' if format_hint == 'csv' else '\t'
-            parsed_data = import_service.parse_csv(content, delimiter)
-            detected_format = format_hint
-        else:
-            parsed_data = import_service.parse_plain_text(content, schema_fields)
-            detected_format = 'plain'
+        # Stream the (spooled) upload without another full copy;
+        # only the preview rows are kept, the rest are just counted
+        with import_service.spool_upload(file.stream) as spool:
+            # No telling extension - refuse binary files (images, PDFs, archives)
+            # from their first bytes instead of failing mid-parse
+            if format_hint == 'auto':
+                binary_type = import_service.sniff_binary_type(spool)
+                if binary_type:
+                    return jsonify({'error': f'Unsupported file type: {binary_type}'}), 415
+            detected_format, preview, record_count = import_service.preview_file(spool, format_hint, schema_fields)
         
         # Suggest mapping
-        schema_field_defs = [
-            {'field_name': f.field_name, 'field_type': f.field_type, 'is_required': f.is_required}
-            for f in schema.fields if not f.is_deleted
-        ]
-        mapping = import_service.suggest_field_mapping(parsed_data, schema_field_defs)
+        mapping = import_service.suggest_field_mapping(preview, schema_field_defs)
         
         return jsonify({
             'filename': file.filename,
             'format_detected': detected_format,
-            'record_count': len(parsed_data),
-            'preview': parsed_data[:10],
+            'record_count': record_count,
+            'preview': preview,
             'suggested_mapping': mapping,
-            'data_fields': list(parsed_data[0].keys()) if parsed_data else [],
+            'data_fields': import_service.get_columns(preview),
             'schema_fields': schema_fields,
         })
         
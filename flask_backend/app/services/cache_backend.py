@@ -0,0 +1,164 @@
+"""
+RedisCacheBackend - Shared second-level cache for MetadataCatalog
+"""
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Callable, Iterable, Optional, Tuple
+import orjson
+import redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+class RedisCacheBackend:
+    """
+    Cache shared by all worker processes, kept in Redis
+
+    Entries are stored as orjson bytes under prefix + key, together with their
+    invalidation tags; every tag is a Redis set of the keys stored under it, so
+    invalidating a tag in one worker removes the shared entries for all of
+    them. Each invalidation is also published on a pub/sub channel, so other
+    workers can drop their own in-process copies (see
+    subscribe_invalidations). Redis errors are logged and treated as cache
+    misses.
+    """
+
+    def __init__(self, client: "redis.Redis", prefix: str = "meta:"):
+        """
+        Args:
+            client: Redis client
+            prefix: Namespace for every key this backend writes
+        """
+        self.client = client
+        self.prefix = prefix
+        self.channel = f"{prefix}invalidate"
+        # Weak references to the subscribed callbacks, so catalogs created
+        # per request don't stay alive through this (per-process) backend
+        self._listeners = []
+        self._listeners_lock = threading.Lock()
+        self._subscriber = None
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "meta:") -> "RedisCacheBackend":
+        """Create a backend with a client connected to the given Redis URL"""
+        return cls(redis.Redis.from_url(url), prefix=prefix)
+
+    def get(self, key: str) -> Optional[Tuple[Any, Tuple[str, ...], Optional[float]]]:
+        """
+        Get a cached entry
+
+        Returns:
+            (value, tags, remaining ttl in seconds or None if the key has no
+            expiry) or None on a miss
+        """
+        full_key = self.prefix + key
+        try:
+            pipe = self.client.pipeline()
+            pipe.get(full_key)
+            pipe.pttl(full_key)
+            raw, pttl = pipe.execute()
+        except RedisError as e:
+            logger.warning("Shared cache read failed for %s: %s", key, e)
+            return None
+        if raw is None:
+            return None
+        try:
+            entry = orjson.loads(raw)
+            return entry["v"], tuple(entry["t"]), pttl / 1000 if pttl > 0 else None
+        except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+            # Corrupt or foreign value under our prefix: treat as a miss
+            logger.warning("Shared cache entry for %s is unreadable: %s", key, e)
+            return None
+
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str] = ()):
+        """
+        Store an entry for ttl seconds under the given invalidation tags
+        """
+        tags = tuple(tags)
+        full_key = self.prefix + key
+        try:
+            pipe = self.client.pipeline()
+            pipe.setex(full_key, ttl, orjson.dumps({"v": value, "t": tags}))
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                pipe.sadd(tag_key, full_key)
+                pipe.expire(tag_key, ttl)
+            pipe.execute()
+        except (RedisError, orjson.JSONEncodeError, TypeError) as e:
+            # Unserializable values (e.g. a Decimal in metadata_json) just
+            # skip the shared cache; the local copy is still kept
+            logger.warning("Shared cache write failed for %s: %s", key, e)
+
+    def delete_tags(self, tags: Iterable[str]):
+        """Delete every entry stored under any of the given tags"""
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            keys = set()
+            for tag_key in tag_keys:
+                keys.update(self.client.smembers(tag_key))
+            self.client.delete(*keys, *tag_keys)
+            self.client.publish(self.channel, orjson.dumps({"tags": list(tags)}))
+        except RedisError as e:
+            logger.warning("Shared cache invalidation failed for %s: %s", tag_keys, e)
+
+    def clear(self):
+        """Delete every key under this backend's prefix"""
+        try:
+            keys = list(self.client.scan_iter(match=self.prefix + "*"))
+            if keys:
+                self.client.delete(*keys)
+            self.client.publish(self.channel, orjson.dumps({"tags": None}))
+        except RedisError as e:
+            logger.warning("Shared cache clear failed: %s", e)
+
+    def subscribe_invalidations(self, callback: Callable[[Optional[Tuple[str, ...]]], None]):
+        """
+        Call callback(tags) whenever any process invalidates tags
+
+        tags is None when everything must go: after a clear(), or when the
+        subscription dropped and invalidations may have been missed. The
+        callback must be a bound method; it is held weakly and dropped once
+        its object is garbage collected. Messages are handled on a
+        background thread started by the first subscription.
+        """
+        with self._listeners_lock:
+            self._listeners.append(weakref.WeakMethod(callback))
+            if self._subscriber is None:
+                try:
+                    pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(**{self.channel: self._on_invalidation})
+                    self._subscriber = pubsub.run_in_thread(
+                        sleep_time=1.0, daemon=True,
+                        exception_handler=self._on_subscriber_error
+                    )
+                except RedisError as e:
+                    logger.warning("Shared cache invalidation subscribe failed: %s", e)
+
+    def _on_invalidation(self, message):
+        try:
+            tags = orjson.loads(message["data"])["tags"]
+        except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+            logger.warning("Ignoring malformed invalidation message: %s", e)
+            return
+        self._notify(tuple(tags) if tags is not None else None)
+
+    def _on_subscriber_error(self, error, pubsub, thread):
+        # Invalidations sent while disconnected are lost, so everything held
+        # locally may be stale; redis-py resubscribes on the next read
+        logger.warning("Shared cache invalidation channel error: %s", error)
+        self._notify(None)
+        time.sleep(1.0)
+
+    def _notify(self, tags: Optional[Tuple[str, ...]]):
+        with self._listeners_lock:
+            self._listeners = [ref for ref in self._listeners if ref() is not None]
+            callbacks = [ref() for ref in self._listeners]
+        for callback in callbacks:
+            if callback is not None:
+                callback(tags)
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
@@ -2,72 +2,325 @@
 Data Import Service
 Handles parsing and importing data from multiple formats
 """
+import codecs
 import csv
-import json
 import io
-from typing import List, Dict, Any, Tuple
+import mmap
+import os
+import orjson
+import shutil
+from contextlib import contextmanager
+from functools import lru_cache
+from tempfile import SpooledTemporaryFile
+from itertools import islice, chain
+from typing import List, Dict, Any, Tuple, IO, Iterator, Iterable, Callable, Optional
 from datetime import datetime
 import re
 
+try:  # Optional: multithreaded C++ CSV reader used for large inputs
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
+
+# Number of leading characters inspected when sniffing the data format
+SNIFF_SIZE = 4096
+
+# csv.Sniffer delimiter -> format name used by auto_parse
+SNIFFED_FORMATS = {
+    ',': 'csv',
+    '\t': 'tsv',
+    '|': 'pipe',
+    ';': 'semicolon',
+}
+
+# Delimited format name -> delimiter
+FORMAT_DELIMITERS = {name: delimiter for delimiter, name in SNIFFED_FORMATS.items()}
+
+# Anything that looks like "key: value" / "key = value" (format detection)
+KEYVALUE_PATTERN = re.compile(r'\w+\s*[:=]\s*.+')
+# Delimited content below this size is always parsed with the stdlib reader
+FAST_CSV_MIN_SIZE = 16 * 1024
+
+# Uploads larger than this roll over from memory to a temp file on disk
+UPLOAD_SPOOL_SIZE = 16 * 1024 * 1024
+
+# Buffer size used when copying an upload stream into the spool
+UPLOAD_COPY_BUFSIZE = 1024 * 1024
+
+# Rows per window when streaming delimited files
+PARSE_WINDOW_SIZE = 10000
+
+# Bytes read from an upload to check for a binary (non-text) file
+MAGIC_SNIFF_SIZE = 512
+
+# Leading magic bytes -> MIME type of binary files that can't be imported
+BINARY_SIGNATURES = {
+    b'\xff\xd8\xff': 'image/jpeg',
+    b'\x89PNG\r\n\x1a\n': 'image/png',
+    b'GIF87a': 'image/gif',
+    b'GIF89a': 'image/gif',
+    b'%PDF': 'application/pdf',
+    b'PK\x03\x04': 'application/zip',
+    b'\x1f\x8b': 'application/gzip',
+    b'\x1a\x45\xdf\xa3': 'video/x-matroska',
+}
+
+# Default cap on errors collected by validate_against_schema
+MAX_VALIDATION_ERRORS = 100
+
+
+# Strings _cast_boolean reads as True (anything else is False); the common
+# casings are listed so most values match without a lower() copy
+TRUTHY_VALUES = frozenset(('true', '1', 'yes', 'y', 'True', 'TRUE', 'Yes', 'YES', 'Y'))
+
+
+def _cast_boolean(value):
+    if isinstance(value, bool):
+        return value
+    text = value if isinstance(value, str) else str(value)
+    return text in TRUTHY_VALUES or text.lower() in TRUTHY_VALUES
+
+
+def _cast_json(value):
+    if isinstance(value, str):
+        return orjson.loads(value)
+    return value
+
+
+# Schema field type -> caster used by validate_against_schema (default str).
+# Dates stay strings here; the backend handles date parsing.
+TYPE_CASTERS = {
+    'integer': int,
+    'float': float,
+    'boolean': _cast_boolean,
+    'date': str,
+    'json': _cast_json,
+    'array': _cast_json,
+    'object': _cast_json,
+    'string': str,
+}
+
+
+# Casters that already raise on None and '', so a required field using one
+# needs no separate emptiness check in generated code
+SELF_CHECKING_CASTERS = frozenset((int, float))
+
+
+@lru_cache(maxsize=128)
+def _compile_record_caster(lookups: Tuple[Tuple, ...]) -> Optional[Callable[[Dict], Dict]]:
+    """
+    Generate a straight-line caster for one record of a fixed schema
+    
+    Field names, source columns, casters and required checks are inlined, so
+    casting a record is one call with no per-field loop or tuple unpacking.
+    Names and columns only ever enter the source through repr(). Cached per
+    schema, so repeat imports against the same schema reuse the function.
+    
+    Args:
+        lookups: (field_name, caster, is_required, column) per schema field
+    
+    Returns: cast_record(record) -> validated record, raising on a missing
+        required value or failed cast; None if a required field has no
+        source column at all
+    """
+    namespace = {}
+    lines = ["def cast_record(record):", "    get = record.get"]
+    items = []
+    for i, (field_name, cast, is_required, column) in enumerate(lookups):
+        if column is None:
+            if is_required:
+                return None
+            items.append(f"{field_name!r}: None")
+            continue
+        namespace[f"cast{i}"] = cast
+        if is_required and cast in SELF_CHECKING_CASTERS:
+            items.append(f"{field_name!r}: cast{i}(get({column!r}))")
+            continue
+        lines.append(f"    v{i} = get({column!r})")
+        if is_required:
+            lines.append(f"    if v{i} is None or v{i} == '': raise ValueError({field_name!r})")
+            items.append(f"{field_name!r}: cast{i}(v{i})")
+        else:
+            items.append(f"{field_name!r}: None if v{i} is None or v{i} == '' else cast{i}(v{i})")
+    lines.append("    return {" + ", ".join(items) + "}")
+    exec("\n".join(lines), namespace)
+    return namespace["cast_record"]
+
+
+class ParsedRows(list):
+    """
+    Parsed records plus their column names
+    
+    Behaves as a plain list of record dicts; `columns` carries the header
+    out of band so callers don't have to re-derive it from the first record.
+    `from_header` is set when every record has those columns (a delimited
+    file's header row); otherwise columns are just the first record's keys.
+    """
+    
+    def __init__(self, rows=(), columns=None, from_header=False):
+        super().__init__(rows)
+        if columns is None:
+            columns = tuple(self[0].keys()) if self and isinstance(self[0], dict) else ()
+        self.columns = tuple(columns)
+        self.from_header = from_header
+
+
+class ValidationErrors(list):
+    """
+    Validation error messages plus a summary of the run
+    
+    Behaves as a plain list of messages. `invalid_count` is the number of
+    records that failed; when `truncated` is set, validation stopped at
+    max_errors, so it only counts the records checked up to that point.
+    """
+    
+    def __init__(self, errors=(), invalid_count=0, truncated=False):
+        super().__init__(errors)
+        self.invalid_count = invalid_count
+        self.truncated = truncated
+
 
 class DataImportService:
     """Parse and import data from various formats"""
     
+    def __init__(self):
+        # schema_id -> ((schema_id, updated_at), field_names, field_defs)
+        self._schema_fields_cache = {}
+    
+    def get_schema_fields(self, schema) -> Tuple[Tuple[str, ...], Tuple[Dict[str, Any], ...]]:
+        """
+        Get active field names and field definitions for a schema
+        
+        Cached per schema and keyed by (schema_id, updated_at), so the walk
+        over the ORM field objects only happens again after the schema changes.
+        
+        Returns: (field_names, field_defs)
+        """
+        key = (schema.id, schema.updated_at)
+        cached = self._schema_fields_cache.get(schema.id)
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
+        
+        active_fields = schema.active_fields
+        field_names = tuple(f.field_name for f in active_fields)
+        field_defs = tuple(
+            {'field_name': f.field_name, 'field_type': f.field_type, 'is_required': f.is_required}
+            for f in active_fields
+        )
+        
+        self._schema_fields_cache[schema.id] = (key, field_names, field_defs)
+        return field_names, field_defs
+    
     def detect_format(self, content: str) -> str:
         """
         Auto-detect data format
         
-        Returns: 'json', 'csv', 'tsv', 'plain', or 'unknown'
+        content may also be raw UTF-8 bytes (bytes, bytearray or memoryview,
+        e.g. an mmapped upload); only the sniffed ends are decoded then.
+        
+        Returns: 'json', 'jsonl', 'csv', 'tsv', 'pipe', 'semicolon', 'keyvalue', or 'unknown'
+        """
+        return self._sniff_format(content)
+    
+    def _sniff_format(self, content: str, whole: bool = True) -> str:
         """
-        content = content.strip()
+        Detect format from the first 4KB of content
         
-        # Try JSON first
-        if (content.startswith('{') or content.startswith('[')) and (content.endswith('}') or content.endswith(']')):
+        Nothing is trial-parsed here, so detection cost stays constant no matter
+        how large the upload is; the full content is parsed once afterwards by
+        the parser for the detected format.
+        
+        Args:
+            content: The content, or only its head when whole is False
+            whole: Whether content ends where the data ends (JSON detection
+                also checks the closing bracket then)
+        """
+        if isinstance(content, str):
+            head = content[:SNIFF_SIZE]
+            tail = content[-64:]
+        else:
+            # Raw bytes: decode just the two windows; a character cut at
+            # either edge is dropped
+            head = bytes(content[:SNIFF_SIZE]).decode('utf-8-sig', 'ignore')
+            tail = bytes(content[-64:]).decode('utf-8', 'ignore')
+        head = head.lstrip()
+        tail = tail.rstrip()
+        
+        # JSON Lines: a complete object on the first line and another object
+        # on the next (a pretty-printed object fails the first check)
+        if head[:1] == '{':
+            first_line, newline, rest = head.partition('\n')
+            if newline and rest.lstrip()[:1] == '{':
+                try:
+                    if isinstance(orjson.loads(first_line), dict):
+                        return 'jsonl'
+                except orjson.JSONDecodeError:
+                    pass
+        
+        # JSON object or array
+        if head[:1] in ('{', '[') and (tail[-1:] in ('}', ']') or not whole):
+            return 'json'
+        
+        # Drop the last line if it was cut off by the sniff window
+        if len(content) > SNIFF_SIZE and '\n' in head:
+            head = head[:head.rindex('\n')]
+        head = head.rstrip()
+        
+        # Check for CSV/TSV patterns (needs at least two lines)
+        first_line, newline, _ = head.partition('\n')
+        if newline:
             try:
-                json.loads(content)
-                return 'json'
-            except:
+                dialect = csv.Sniffer().sniff(head, delimiters=',\t|;')
+                return SNIFFED_FORMATS[dialect.delimiter]
+            except csv.Error:
                 pass
-        
-        # Check for CSV/TSV patterns
-        lines = content.split('\n')
-        if len(lines) > 1:
-            first_line = lines[0]
             
-            # Count delimiters
+            # Sniffer couldn't decide - fall back to counting on the header line
+            # (bounded by the sniff window, so each count is a short C-level scan)
             comma_count = first_line.count(',')
-            tab_count = first_line.count('\t')
-            pipe_count = first_line.count('|')
-            semicolon_count = first_line.count(';')
             
-            # Determine delimiter
-            if tab_count > comma_count and tab_count > 0:
+            # Determine delimiter; later counts are only taken when reached
+            if first_line.count('\t') > comma_count:
                 return 'tsv'
             elif comma_count > 0:
                 return 'csv'
-            elif pipe_count > comma_count:
+            elif '|' in first_line:
                 return 'pipe'
-            elif semicolon_count > comma_count:
+            elif ';' in first_line:
                 return 'semicolon'
         
         # Check for key-value pairs
-        if re.search(r'\w+\s*[:=]\s*.+', content):
+        if KEYVALUE_PATTERN.search(head):
             return 'keyvalue'
         
         return 'unknown'
     
     def parse_json(self, content: str) -> List[Dict[str, Any]]:
         """Parse JSON data"""
-        data = json.loads(content)
-        
+        return self._json_records(orjson.loads(content))
+    
+    def _json_records(self, data: Any) -> List[Dict[str, Any]]:
+        """Normalize decoded JSON into a list of records"""
         # If single object, wrap in array
         if isinstance(data, dict):
-            return [data]
+            return ParsedRows([data])
         elif isinstance(data, list):
-            return data
+            return ParsedRows(data)
         else:
             raise ValueError("JSON must be object or array")
     
+    def parse_jsonl(self, content: str) -> List[Dict[str, Any]]:
+        """Parse JSON Lines data (one JSON object per line)"""
+        return ParsedRows(self.iter_jsonl(content.splitlines()))
+    
+    def iter_jsonl(self, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Yield one record per non-blank line, so only one line is decoded at a time"""
+        for line in lines:
+            if line.strip():
+                yield orjson.loads(line)
+    
     def parse_csv(self, content: str, delimiter: str = ',') -> List[Dict[str, Any]]:
         """Parse CSV/TSV/delimited data"""
         if delimiter == 'tab':
@@ -77,8 +330,46 @@ class DataImportService:
         elif delimiter == 'semicolon':
             delimiter = ';'
         
-        reader = csv.DictReader(io.StringIO(content), delimiter=delimiter)
-        return list(reader)
+        if pa_csv is not None and len(content) >= FAST_CSV_MIN_SIZE:
+            rows = self._parse_csv_arrow(content, delimiter)
+            if rows is not None:
+                return rows
+        
+        return self.parse_csv_stream(io.StringIO(content), delimiter)
+    
+    def _parse_csv_arrow(self, content: str, delimiter: str):
+        """
+        Parse delimited data with pyarrow's C++ reader
+        
+        Every column is read as a string, so rows come out exactly as
+        csv.DictReader would produce them. Returns None when the input needs
+        DictReader's leniency (ragged rows, duplicate headers) or the reader
+        rejects it, so the caller falls back to the stdlib parser.
+        """
+        header = next(csv.reader(io.StringIO(content), delimiter=delimiter), None)
+        if not header or len(set(header)) != len(header):
+            return None
+        
+        try:
+            table = pa_csv.read_csv(
+                pa.BufferReader(content.encode('utf-8')),
+                parse_options=pa_csv.ParseOptions(delimiter=delimiter, newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={name: pa.string() for name in header},
+                    strings_can_be_null=False,
+                    quoted_strings_can_be_null=False,
+                ),
+            )
+        except pa.ArrowException:
+            return None
+        
+        return ParsedRows(table.to_pylist(), header, from_header=True)
+    
+    def parse_csv_stream(self, stream: IO[str], delimiter: str = ',') -> List[Dict[str, Any]]:
+        """Parse CSV/TSV/delimited data row by row from a text stream"""
+        reader = csv.DictReader(stream, delimiter=delimiter)
+        rows = list(reader)
+        return ParsedRows(rows, reader.fieldnames or (), from_header=True)
     
     def parse_keyvalue(self, content: str) -> List[Dict[str, Any]]:
         """
@@ -90,46 +381,332 @@ class DataImportService:
         name: Jane
         age: 25
         """
-        records = []
+        return ParsedRows(self.iter_keyvalue(content.splitlines()))
+    
+    def iter_keyvalue(self, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Yield key-value records from an iterable of lines (e.g. a text stream)"""
         current_record = {}
         
-        for line in content.split('\n'):
+        for line in lines:
             line = line.strip()
             
             # Empty line or separator - save current record
             if not line or line == '---':
                 if current_record:
-                    records.append(current_record)
+                    yield current_record
                     current_record = {}
                 continue
             
-            # Parse key: value or key = value
-            match = re.match(r'([^:=]+)\s*[:=]\s*(.+)', line)
-            if match:
-                key = match.group(1).strip()
-                value = match.group(2).strip()
-                current_record[key] = value
+            # Parse key: value or key = value, splitting on whichever comes first
+            colon = line.find(':')
+            equals = line.find('=')
+            sep = colon if equals < 0 or 0 <= colon < equals else equals
+            if sep > 0:
+                value = line[sep + 1:].lstrip()
+                if value:
+                    current_record[line[:sep].rstrip()] = value
         
         # Add last record
         if current_record:
-            records.append(current_record)
-        
-        return records
+            yield current_record
     
     def parse_plain_text(self, content: str, schema_fields: List[str]) -> List[Dict[str, Any]]:
         """
         Parse plain text by splitting on newlines and mapping to schema fields
         Useful for simple lists
         """
-        lines = [line.strip() for line in content.split('\n') if line.strip()]
+        # Create generic field, or map to first field
+        field = schema_fields[0] if schema_fields else 'value'
+        return ParsedRows(self.iter_plain_text(content.split('\n'), schema_fields), (field,), from_header=True)
+    
+    def iter_plain_text(self, lines: Iterable[str], schema_fields: List[str]) -> Iterator[Dict[str, Any]]:
+        """Yield one record per non-blank line, keyed by the first schema field (or 'value')"""
+        field = schema_fields[0] if schema_fields else 'value'
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield {field: line}
+    
+    def iter_csv_windows(self, stream: IO[str], delimiter: str = ',',
+                         window_size: int = PARSE_WINDOW_SIZE) -> Iterator[ParsedRows]:
+        """
+        Parse delimited data from a text stream in fixed-size windows
         
-        if not schema_fields:
-            # Create generic field
-            return [{'value': line} for line in lines]
+        Only one window of rows is held at a time, so memory stays
+        proportional to window_size rather than to the file.
+        """
+        reader = csv.DictReader(stream, delimiter=delimiter)
+        while True:
+            window = list(islice(reader, window_size))
+            if not window:
+                return
+            yield ParsedRows(window, reader.fieldnames or (), from_header=True)
+    
+    def preview_file(self, fileobj: IO[bytes], format_hint: str = 'auto', schema_fields: List[str] = None,
+                     preview_size: int = 10) -> Tuple[str, ParsedRows, int]:
+        """
+        Parse the start of an uploaded file and count its records
         
-        # Map to first field
-        primary_field = schema_fields[0]
-        return [{primary_field: line} for line in lines]
+        Delimited files only have their preview rows parsed; the rest are
+        counted from raw newlines (see count_delimited_records), or counted
+        row by row when quoting could hide newlines inside fields.
+        Auto-detected input and JSON Lines are parsed lazily, one record at a
+        time; a JSON document is parsed in full via parse_file.
+        
+        Returns: (format_detected, preview_rows, record_count)
+        """
+        if format_hint in ('auto', 'jsonl'):
+            text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+            try:
+                if format_hint == 'auto':
+                    detected_format, records = self.auto_parse_stream(text, schema_fields)
+                else:
+                    detected_format, records = 'jsonl', self.iter_jsonl(text)
+                preview = ParsedRows(islice(records, preview_size))
+                record_count = len(preview) + sum(1 for _ in records)
+            finally:
+                text.detach()
+            return detected_format, preview, record_count
+        
+        if format_hint not in ('csv', 'tsv'):
+            detected_format, data = self.parse_file(fileobj, format_hint, schema_fields)
+            return detected_format, ParsedRows(data[:preview_size], self.get_columns(data),
+                                               from_header=getattr(data, 'from_header', False)), len(data)
+        
+        delimiter = ',' if format_hint == 'csv' else '\t'
+        record_count = self.count_delimited_records(fileobj)
+        fileobj.seek(0)
+        text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+        try:
+            reader = csv.DictReader(text, delimiter=delimiter)
+            preview = ParsedRows(islice(reader, preview_size), reader.fieldnames or (), from_header=True)
+            if record_count is None:
+                # Count the remaining rows on the underlying csv.reader - no
+                # per-row dict; blank rows are skipped just as DictReader does
+                record_count = len(preview) + sum(1 for row in reader.reader if row)
+        finally:
+            # Leave the underlying file open for the caller to close
+            text.detach()
+        return format_hint, preview, record_count
+    
+    def count_delimited_records(self, fileobj: IO[bytes]) -> Optional[int]:
+        """
+        Count the records of a delimited file from its raw newlines
+        
+        Reads the file in UPLOAD_COPY_BUFSIZE blocks into one reused buffer
+        and only counts newline bytes, so no row is decoded or parsed and no
+        per-block bytes object is allocated. Gives up (returns None) as soon
+        as the count could differ from what csv.DictReader sees: quote
+        characters (newlines may be inside fields), blank lines (skipped by
+        DictReader) or bare CR line endings.
+        
+        Returns: Number of records after the header, or None
+        """
+        buffer = bytearray(UPLOAD_COPY_BUFSIZE)
+        newlines = 0
+        previous = b'\n'  # a leading blank line counts as blank too
+        last = b''
+        while True:
+            size = fileobj.readinto(buffer)
+            if not size:
+                break
+            # Only the final block is short; slice (copy) just that one
+            chunk = buffer if size == len(buffer) else buffer[:size]
+            if b'"' in chunk or chunk.count(b'\r') != chunk.count(b'\r\n'):
+                return None
+            # Blank lines inside the block, or straddling the previous one
+            seam = previous + chunk[:2]
+            if b'\n\n' in chunk or b'\n\r\n' in chunk or b'\n\n' in seam or b'\n\r\n' in seam:
+                return None
+            newlines += chunk.count(b'\n')
+            previous = bytes((previous + chunk[-2:])[-2:])
+            last = chunk[-1:]
+        
+        # An unterminated last line is a line too; the first line is the header
+        lines = newlines + (1 if last and last != b'\n' else 0)
+        return max(lines - 1, 0)
+    
+    def get_columns(self, data: List[Dict[str, Any]]) -> Tuple[str, ...]:
+        """
+        Get the column names of parsed data
+        
+        Uses the columns carried by ParsedRows and only falls back to the
+        keys of the first record for plain lists.
+        """
+        columns = getattr(data, 'columns', None)
+        if columns is not None:
+            return columns
+        return tuple(data[0].keys()) if data else ()
+    
+    def spool_upload(self, stream: IO[bytes]) -> SpooledTemporaryFile:
+        """
+        Get a seekable binary file for an upload stream
+        
+        Werkzeug already buffers multipart uploads in a seekable (spooled)
+        file, so such streams are reused as-is instead of being written out a
+        second time. Anything else is copied into a spooled temp file: up to
+        UPLOAD_SPOOL_SIZE stays in memory, larger uploads roll over to disk.
+        
+        Returns: file positioned at the start
+        """
+        seekable = getattr(stream, 'seekable', None)
+        if seekable is not None and seekable():
+            stream.seek(0)
+            return stream
+        
+        spool = SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE)
+        shutil.copyfileobj(stream, spool, UPLOAD_COPY_BUFSIZE)
+        spool.seek(0)
+        return spool
+    
+    def sniff_binary_type(self, fileobj: IO[bytes]) -> Optional[str]:
+        """
+        Identify a binary upload from its magic number
+        
+        Reads at most MAGIC_SNIFF_SIZE bytes, whatever the file size, and
+        rewinds the file afterwards.
+        
+        Returns: MIME type of a recognised binary format, else None
+        """
+        head = fileobj.read(MAGIC_SNIFF_SIZE)
+        fileobj.seek(0)
+        if head[:8].startswith(b'\x00\x00\x00') and head[4:8] == b'ftyp':
+            return 'video/mp4'
+        for signature, mime in BINARY_SIGNATURES.items():
+            if head.startswith(signature):
+                return mime
+        # NUL bytes never appear in text (and UTF-16 isn't supported)
+        if b'\x00' in head:
+            return 'application/octet-stream'
+        return None
+    
+    def parse_file(self, fileobj: IO[bytes], format_hint: str = 'auto',
+                   schema_fields: List[str] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Parse an uploaded file from a binary stream
+        
+        Delimited files are decoded incrementally (BOM-aware) and read row by
+        row; JSON is parsed by orjson from a zero-copy view of the file (see
+        _upload_buffer) without a decoded str copy. Auto-detected input is
+        read line by line via auto_parse_stream, never as one whole string.
+        
+        Args:
+            fileobj: Binary file object, e.g. from spool_upload
+            format_hint: 'auto', 'json', 'jsonl', 'csv' or 'tsv'
+            schema_fields: Field names used by the plain text fallback
+        
+        Returns: (format_detected, parsed_data)
+        """
+        if format_hint == 'json':
+            # orjson validates and decodes the UTF-8 bytes itself, straight
+            # from the mapped buffer; only a leading BOM needs skipping
+            with self._upload_buffer(fileobj) as view:
+                start = len(codecs.BOM_UTF8) if view[:3] == codecs.BOM_UTF8 else 0
+                with view[start:] as body:
+                    data = orjson.loads(body)
+            return 'json', self._json_records(data)
+        
+        text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+        try:
+            if format_hint in ('csv', 'tsv'):
+                delimiter = ',' if format_hint == 'csv' else '\t'
+                return format_hint, self.parse_csv_stream(text, delimiter)
+            if format_hint == 'jsonl':
+                return 'jsonl', ParsedRows(self.iter_jsonl(text))
+            detected_format, records = self.auto_parse_stream(text, schema_fields)
+            if detected_format in FORMAT_DELIMITERS:
+                # records is the DictReader itself; keep its header
+                return detected_format, ParsedRows(records, records.fieldnames or (), from_header=True)
+            return detected_format, ParsedRows(records)
+        finally:
+            # Leave the underlying file open for the caller to close
+            text.detach()
+    
+    def parse_content(self, content: str, format_hint: str = 'auto',
+                      schema_fields: List[str] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Parse raw content in the given format
+        
+        Args:
+            content: Raw data string
+            format_hint: 'auto', 'json', 'jsonl', 'csv', 'tsv', 'pipe',
+                'semicolon', 'keyvalue'; anything else is parsed as plain text
+            schema_fields: Field names used by the plain text parser
+        
+        Returns: (format_detected, parsed_data)
+        """
+        if format_hint == 'auto':
+            return self.auto_parse(content, schema_fields)
+        if format_hint == 'json':
+            return 'json', self.parse_json(content)
+        if format_hint == 'jsonl':
+            return 'jsonl', self.parse_jsonl(content)
+        if format_hint in FORMAT_DELIMITERS:
+            return format_hint, self.parse_csv(content, FORMAT_DELIMITERS[format_hint])
+        if format_hint == 'keyvalue':
+            return 'keyvalue', self.parse_keyvalue(content)
+        return 'plain', self.parse_plain_text(content, schema_fields or [])
+    
+    @contextmanager
+    def _upload_buffer(self, fileobj: IO[bytes]) -> Iterator[memoryview]:
+        """
+        Zero-copy view of a binary file's whole contents
+        
+        BytesIO buffers are exposed directly and files with a descriptor are
+        memory-mapped, so pages are read in by the OS as the parser walks them
+        instead of being copied into one bytes object first. Werkzeug hands
+        uploads over as a SpooledTemporaryFile (see spool_upload): its
+        fileno() rolls a still in-memory spool (at most a few hundred KB)
+        over to its temp file, after which it is mapped like any other file.
+        Anything else falls back to read().
+        """
+        if isinstance(fileobj, io.BytesIO):
+            with fileobj.getbuffer() as view:
+                yield view
+            return
+        
+        try:
+            fileno = fileobj.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            fileno = None
+        
+        # mmap can't map empty files
+        if fileno is None or os.fstat(fileno).st_size == 0:
+            with memoryview(fileobj.read()) as view:
+                yield view
+            return
+        
+        with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            yield view
+    
+    def auto_parse_stream(self, stream: IO[str], schema_fields: List[str] = None) -> Tuple[str, Iterator[Dict[str, Any]]]:
+        """
+        Detect the format from the head of a text stream and parse it lazily
+        
+        Only the first SNIFF_SIZE characters (completed to a full line) are
+        read up front; JSON Lines, delimited, key-value and plain text records
+        are then yielded as the stream is consumed. A JSON document still has
+        to be decoded whole.
+        
+        Returns: (format_detected, record iterator)
+        """
+        head = stream.read(SNIFF_SIZE)
+        whole = len(head) < SNIFF_SIZE
+        if not whole:
+            head += stream.readline()
+        
+        format_type = self._sniff_format(head, whole)
+        if format_type == 'json':
+            return format_type, iter(self.parse_json(head + stream.read()))
+        
+        lines = chain(io.StringIO(head), stream)
+        if format_type == 'jsonl':
+            return format_type, self.iter_jsonl(lines)
+        if format_type in FORMAT_DELIMITERS:
+            return format_type, iter(csv.DictReader(lines, delimiter=FORMAT_DELIMITERS[format_type]))
+        if format_type == 'keyvalue':
+            return format_type, self.iter_keyvalue(lines)
+        return format_type, self.iter_plain_text(lines, schema_fields or [])
     
     def auto_parse(self, content: str, schema_fields: List[str] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """
@@ -141,6 +718,8 @@ class DataImportService:
         
         if format_type == 'json':
             data = self.parse_json(content)
+        elif format_type == 'jsonl':
+            data = self.parse_jsonl(content)
         elif format_type == 'csv':
             data = self.parse_csv(content, ',')
         elif format_type == 'tsv':
@@ -157,26 +736,93 @@ class DataImportService:
         
         return format_type, data
     
-    def validate_against_schema(self, data: List[Dict[str, Any]], schema_fields: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    def apply_field_mapping(self, data: List[Dict[str, Any]], field_mapping: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        Rename data fields to schema fields
+        
+        The rename table is built once from the columns; rows with extra
+        keys fall back to looking those keys up in field_mapping.
+        
+        Returns: renamed records
+        """
+        rename = {k: field_mapping.get(k, k) for k in self.get_columns(data)}
+        return [
+            {(rename[k] if k in rename else field_mapping.get(k, k)): v for k, v in record.items()}
+            for record in data
+        ]
+    
+    def validate_against_schema(self, data: List[Dict[str, Any]], schema_fields: List[Dict],
+                                max_errors: int = MAX_VALIDATION_ERRORS,
+                                field_mapping: Dict[str, str] = None) -> Tuple[List[Dict], ValidationErrors]:
         """
         Validate and type-cast data against schema
         
-        Returns: (valid_records, errors)
+        Validation stops once max_errors errors have been collected, so a file
+        that is wrong throughout is rejected without walking every record.
+        
+        Args:
+            data: Parsed records
+            schema_fields: Field definitions with field_name, field_type, is_required
+            max_errors: Stop after this many errors (None for no limit)
+            field_mapping: Optional {data_field: schema_field}; values are read
+                through it directly, so no renamed copy of the data is needed
+        
+        Returns: (valid_records, errors), valid records keyed by schema field;
+            errors is a ValidationErrors list carrying invalid_count and truncated
         """
         valid_records = []
-        errors = []
+        errors = ValidationErrors()
+        
+        # Data column feeding each schema field (None if nothing maps to it)
+        source_of = {}
+        if field_mapping:
+            for data_field, schema_field in field_mapping.items():
+                source_of[schema_field] = data_field
+        # Caster resolved once per field instead of an if/elif chain per value
+        lookups = [
+            (
+                f['field_name'],
+                TYPE_CASTERS.get(f['field_type'], str),
+                f.get('is_required', False),
+                source_of.get(f['field_name'], None if f['field_name'] in (field_mapping or ()) else f['field_name']),
+            )
+            for f in schema_fields
+        ]
+        
+        # A required column missing from the header fails every record the
+        # same way - report it once instead of once per record. Only a real
+        # header says that; the first record of JSON/key-value data may just
+        # omit a key the others have, so those go through the per-record pass
+        if data and getattr(data, 'from_header', False):
+            columns = self.get_columns(data)
+            missing = [
+                field_name for field_name, _, is_required, column in lookups
+                if is_required and column not in columns
+            ]
+            if missing:
+                return [], ValidationErrors(
+                    [f"Required column(s) missing from data: {', '.join(missing)}"],
+                    invalid_count=len(data)
+                )
+        
+        # Clean data goes through a caster generated for this schema; only
+        # data with errors takes the record-by-record pass below, which
+        # builds the error messages
+        cast_record = _compile_record_caster(tuple(lookups))
+        if cast_record is not None:
+            try:
+                return [cast_record(record) for record in data], errors
+            except Exception:
+                pass
+        valid_records = []
         
         for idx, record in enumerate(data):
             validated_record = {}
             record_errors = []
             
-            for field in schema_fields:
-                field_name = field['field_name']
-                field_type = field['field_type']
-                is_required = field.get('is_required', False)
-                
+            for field_name, cast, is_required, column in lookups:
                 # Get value from record
-                value = record.get(field_name)
+                value = record.get(column) if column is not None else None
                 
                 # Check required
                 if is_required and (value is None or value == ''):
@@ -190,34 +836,17 @@ class DataImportService:
                 
                 # Type casting
                 try:
-                    if field_type == 'integer':
-                        validated_record[field_name] = int(value)
-                    elif field_type == 'float':
-                        validated_record[field_name] = float(value)
-                    elif field_type == 'boolean':
-                        if isinstance(value, bool):
-                            validated_record[field_name] = value
-                        else:
-                            lower_val = str(value).lower()
-                            validated_record[field_name] = lower_val in ('true', '1', 'yes', 'y')
-                    elif field_type == 'date':
-                        # Try parsing date
-                        if isinstance(value, str):
-                            validated_record[field_name] = value  # Let backend handle date parsing
-                        else:
-                            validated_record[field_name] = str(value)
-                    elif field_type in ('json', 'array', 'object'):
-                        if isinstance(value, str):
-                            validated_record[field_name] = json.loads(value)
-                        else:
-                            validated_record[field_name] = value
-                    else:  # string
-                        validated_record[field_name] = str(value)
+                    validated_record[field_name] = cast(value)
                 except Exception as e:
                     record_errors.append(f"Record {idx + 1}: '{field_name}' - {str(e)}")
             
             if record_errors:
                 errors.extend(record_errors)
+                errors.invalid_count += 1
+                if max_errors is not None and len(errors) >= max_errors:
+                    del errors[max_errors:]
+                    errors.truncated = True
+                    break
             else:
                 valid_records.append(validated_record)
         
@@ -232,29 +861,36 @@ class DataImportService:
         if not data:
             return {}
         
-        data_fields = list(data[0].keys())
+        data_fields = self.get_columns(data)
         schema_field_names = [f['field_name'] for f in schema_fields]
         
+        # Lookup tables built once: exact names, lowercased name -> first
+        # schema field with it, and the lowercased names for substring checks
+        exact = set(schema_field_names)
+        by_lower = {}
+        for schema_field in schema_field_names:
+            by_lower.setdefault(schema_field.lower(), schema_field)
+        lowered = [(schema_field.lower(), schema_field) for schema_field in schema_field_names]
+        
         mapping = {}
         
         for data_field in data_fields:
             # Exact match
-            if data_field in schema_field_names:
+            if data_field in exact:
                 mapping[data_field] = data_field
                 continue
             
             # Case-insensitive match
             lower_data = data_field.lower()
-            for schema_field in schema_field_names:
-                if schema_field.lower() == lower_data:
-                    mapping[data_field] = schema_field
-                    break
+            schema_field = by_lower.get(lower_data)
+            if schema_field is not None:
+                mapping[data_field] = schema_field
+                continue
             
             # Fuzzy match (contains)
-            if data_field not in mapping:
-                for schema_field in schema_field_names:
-                    if lower_data in schema_field.lower() or schema_field.lower() in lower_data:
-                        mapping[data_field] = schema_field
-                        break
+            for lower_schema, schema_field in lowered:
+                if lower_data in lower_schema or lower_schema in lower_data:
+                    mapping[data_field] = schema_field
+                    break
         
         return mapping
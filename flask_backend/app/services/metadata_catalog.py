@@ -1,12 +1,35 @@
 """
 MetadataCatalog - Centralized schema metadata management with caching
 """
+import os
 import threading
-from typing import Dict, List, Optional, Any
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Iterable
 from functools import lru_cache
-from datetime import datetime, timedelta
+from datetime import datetime
+from sqlalchemy import select, func
+from sqlalchemy.orm import joinedload, selectinload
 from ..models import SchemaModel, SchemaField, AssetType
 from ..extensions import db
+from .schema_matcher import clear_candidate_cache
+
+# Entries kept before the least recently used ones are evicted
+CACHE_MAX_ENTRIES = 4096
+
+
+@lru_cache(maxsize=None)
+def shared_cache_from_env():
+    """
+    Shared Redis cache configured by METADATA_CACHE_REDIS_URL, or None
+    
+    Created once per process, so every catalog instance uses the same client.
+    """
+    url = os.getenv("METADATA_CACHE_REDIS_URL")
+    if not url:
+        return None
+    from .cache_backend import RedisCacheBackend
+    return RedisCacheBackend.from_url(url)
 
 
 class MetadataCatalog:
@@ -14,15 +37,28 @@ class MetadataCatalog:
     Centralized catalog for schema metadata with intelligent caching
     """
     
-    def __init__(self, cache_ttl: int = 300):
+    def __init__(self, cache_ttl: int = 300, max_entries: int = CACHE_MAX_ENTRIES, shared_cache=None):
         """
         Args:
             cache_ttl: Cache time-to-live in seconds (default 5 minutes)
+            max_entries: Cache size before least recently used entries are evicted
+            shared_cache: Optional second-level cache shared between processes
+                (defaults to shared_cache_from_env())
         """
-        self.cache = {}
-        self.cache_timestamps = {}
+        self.cache = OrderedDict()
+        # key -> monotonic deadline after which the entry is expired
+        self.cache_expiry = {}
+        # Secondary index so invalidation touches only the affected keys:
+        # key -> tags it was stored under, tag -> keys stored under it
+        self.cache_tags = {}
+        self.tag_index = {}
         self.cache_ttl = cache_ttl
+        self.max_entries = max_entries
+        self.shared_cache = shared_cache if shared_cache is not None else shared_cache_from_env()
         self.lock = threading.RLock()
+        # Invalidations made by other workers drop this process's copies too
+        if self.shared_cache is not None:
+            self.shared_cache.subscribe_invalidations(self._invalidate_local_tags)
     
     def get_schema(self, schema_id: int, use_cache: bool = True) -> Optional[Dict]:
         """
@@ -42,8 +78,8 @@ class MetadataCatalog:
             if cached is not None:
                 return cached
         
-        # Load from database
-        schema = SchemaModel.query.get(schema_id)
+        # Load from database, fields joined in so the dict builds in one round-trip
+        schema = SchemaModel.query.options(joinedload(SchemaModel.fields)).get(schema_id)
         if not schema:
             return None
         
@@ -51,7 +87,8 @@ class MetadataCatalog:
         
         # Cache it
         if use_cache:
-            self._put_in_cache(cache_key, schema_data)
+            self._put_in_cache(cache_key, schema_data, tags=(f"schema:{schema_id}",))
+            self._share_field_list(schema_data)
         
         return schema_data
     
@@ -80,7 +117,7 @@ class MetadataCatalog:
                 return cached
         
         # Load from database
-        query = SchemaModel.query.filter_by(asset_type_id=asset_type_id)
+        query = SchemaModel.query.options(selectinload(SchemaModel.fields)).filter_by(asset_type_id=asset_type_id)
         if active_only:
             query = query.filter_by(is_active=True)
         
@@ -88,8 +125,11 @@ class MetadataCatalog:
         schemas_data = [self._build_schema_dict(s) for s in schemas]
         
         # Cache it
+        # (any schema change may add to or alter a list, hence "schema_lists")
         if use_cache:
-            self._put_in_cache(cache_key, schemas_data)
+            self._put_in_cache(cache_key, schemas_data, tags=(f"asset_type:{asset_type_id}", "schema_lists"))
+            for schema_data in schemas_data:
+                self._share_field_list(schema_data)
         
         return schemas_data
     
@@ -104,25 +144,15 @@ class MetadataCatalog:
         Returns:
             Field dict or None
         """
-        field = SchemaField.query.filter_by(
-            schema_id=schema_id,
-            field_name=field_name,
-            is_deleted=False
-        ).first()
+        # Name index over the cached active field list, invalidated with it
+        cache_key = f"fields_by_name:{schema_id}"
         
-        if not field:
-            return None
+        by_name = self._get_from_cache(cache_key)
+        if by_name is None:
+            by_name = {f['name']: f for f in self.get_fields(schema_id)}
+            self._put_in_cache(cache_key, by_name, tags=(f"schema:{schema_id}",))
         
-        return {
-            'id': field.id,
-            'name': field.field_name,
-            'type': field.field_type,
-            'required': field.is_required,
-            'default': field.default_value,
-            'constraints': field.constraints,
-            'description': field.description,
-            'order': field.order_index
-        }
+        return by_name.get(field_name)
     
     def get_fields(
         self,
@@ -152,17 +182,19 @@ class MetadataCatalog:
         fields = query.order_by(SchemaField.order_index).all()
         fields_data = [self._build_field_dict(f) for f in fields]
         
-        self._put_in_cache(cache_key, fields_data)
+        self._put_in_cache(cache_key, fields_data, tags=(f"schema:{schema_id}",))
         
         return fields_data
     
     def field_exists(self, schema_id: int, field_name: str) -> bool:
-        """Check if field exists in schema"""
-        return SchemaField.query.filter_by(
-            schema_id=schema_id,
-            field_name=field_name,
-            is_deleted=False
-        ).count() > 0
+        """Check if field exists in schema (EXISTS stops at the first match)"""
+        return db.session.query(
+            SchemaField.query.filter_by(
+                schema_id=schema_id,
+                field_name=field_name,
+                is_deleted=False
+            ).exists()
+        ).scalar()
     
     def get_asset_type(self, asset_type_id: int) -> Optional[Dict]:
         """Get asset type information"""
@@ -177,7 +209,7 @@ class MetadataCatalog:
             return None
         
         data = asset_type.to_dict()
-        self._put_in_cache(cache_key, data)
+        self._put_in_cache(cache_key, data, tags=(f"asset_type:{asset_type_id}",))
         
         return data
     
@@ -192,7 +224,7 @@ class MetadataCatalog:
         asset_types = AssetType.query.all()
         data = [at.to_dict() for at in asset_types]
         
-        self._put_in_cache(cache_key, data)
+        self._put_in_cache(cache_key, data, tags=("asset_types",))
         
         return data
     
@@ -206,62 +238,81 @@ class MetadataCatalog:
         Returns:
             Statistics dict
         """
-        from ..models import MetadataRecord
-        
-        cache_key = f"stats:{schema_id}"
+        # Both counts come back from one query (see get_schema_statistics_bulk)
+        return self.get_schema_statistics_bulk([schema_id])[schema_id]
+    
+    def get_schema_statistics_bulk(self, schema_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Get usage statistics for several schemas in one query
         
-        cached = self._get_from_cache(cache_key)
-        if cached is not None:
-            return cached
+        Args:
+            schema_ids: Schema IDs
         
-        record_count = MetadataRecord.query.filter_by(schema_id=schema_id).count()
-        field_count = SchemaField.query.filter_by(
-            schema_id=schema_id,
-            is_deleted=False
-        ).count()
-        
-        stats = {
-            'schema_id': schema_id,
-            'record_count': record_count,
-            'field_count': field_count,
-            'last_updated': datetime.utcnow().isoformat()
-        }
+        Returns:
+            Dict of schema_id -> statistics dict
+        """
+        from ..models import MetadataRecord
         
-        self._put_in_cache(cache_key, stats, ttl=60)  # Shorter TTL for stats
+        result = {}
+        missing = []
+        for schema_id in schema_ids:
+            cached = self._get_from_cache(f"stats:{schema_id}")
+            if cached is not None:
+                result[schema_id] = cached
+            else:
+                missing.append(schema_id)
+        
+        if not missing:
+            return result
+        
+        # Both counts as correlated subqueries, so all schemas load in one round-trip
+        record_count = (
+            select(func.count(MetadataRecord.id))
+            .where(MetadataRecord.schema_id == SchemaModel.id)
+            .correlate(SchemaModel)
+            .scalar_subquery()
+        )
+        field_count = (
+            select(func.count(SchemaField.id))
+            .where(SchemaField.schema_id == SchemaModel.id, SchemaField.is_deleted == False)
+            .correlate(SchemaModel)
+            .scalar_subquery()
+        )
+        rows = db.session.query(SchemaModel.id, record_count, field_count).filter(
+            SchemaModel.id.in_(missing)
+        ).all()
+        counts = {row[0]: (row[1], row[2]) for row in rows}
+        
+        last_updated = datetime.utcnow().isoformat()
+        for schema_id in missing:
+            records, fields = counts.get(schema_id, (0, 0))
+            stats = {
+                'schema_id': schema_id,
+                'record_count': records,
+                'field_count': fields,
+                'last_updated': last_updated
+            }
+            self._put_in_cache(f"stats:{schema_id}", stats, ttl=60, tags=(f"schema:{schema_id}",))  # Shorter TTL for stats
+            result[schema_id] = stats
         
-        return stats
+        return result
     
     def invalidate_schema(self, schema_id: int):
         """Invalidate all cache entries for a schema"""
-        with self.lock:
-            keys_to_remove = []
-            for key in self.cache.keys():
-                if f":{schema_id}" in key or key.startswith(f"schema:{schema_id}"):
-                    keys_to_remove.append(key)
-            
-            for key in keys_to_remove:
-                del self.cache[key]
-                if key in self.cache_timestamps:
-                    del self.cache_timestamps[key]
+        clear_candidate_cache()
+        self._invalidate_tags((f"schema:{schema_id}", "schema_lists"))
     
     def invalidate_asset_type(self, asset_type_id: int):
         """Invalidate all cache entries for an asset type"""
-        with self.lock:
-            keys_to_remove = []
-            for key in self.cache.keys():
-                if f"asset_type:{asset_type_id}" in key:
-                    keys_to_remove.append(key)
-            
-            for key in keys_to_remove:
-                del self.cache[key]
-                if key in self.cache_timestamps:
-                    del self.cache_timestamps[key]
+        clear_candidate_cache()
+        self._invalidate_tags((f"asset_type:{asset_type_id}", "asset_types"))
     
     def clear_cache(self):
         """Clear all cache entries"""
-        with self.lock:
-            self.cache.clear()
-            self.cache_timestamps.clear()
+        clear_candidate_cache()
+        if self.shared_cache is not None:
+            self.shared_cache.clear()
+        self._invalidate_local_tags(None)
     
     def get_cache_stats(self) -> Dict:
         """Get cache statistics"""
@@ -269,34 +320,133 @@ class MetadataCatalog:
             return {
                 'size': len(self.cache),
                 'keys': list(self.cache.keys()),
-                'ttl': self.cache_ttl
+                'ttl': self.cache_ttl,
+                'max_entries': self.max_entries
             }
     
     # Private methods
     
     def _get_from_cache(self, key: str) -> Optional[Any]:
-        """Get value from cache if not expired"""
+        """
+        Get value from cache if not expired
+        
+        Hits don't take the lock: each dict/OrderedDict call below is atomic
+        under the GIL, and writers only ever replace or remove whole entries.
+        The lock is taken only to evict an expired entry.
+        """
+        value = self.cache.get(key)
+        if value is None:
+            return self._get_from_shared_cache(key)
+        
+        # Check expiry (monotonic seconds, unaffected by wall-clock changes)
+        deadline = self.cache_expiry.get(key)
+        if deadline is not None and time.monotonic() > deadline:
+            # Expired - evict unless another thread has refreshed it meanwhile
+            with self.lock:
+                if self.cache_expiry.get(key) == deadline:
+                    self._evict(key)
+            return self._get_from_shared_cache(key)
+        
+        # Mark as recently used; the entry may have been evicted meanwhile
+        try:
+            self.cache.move_to_end(key)
+        except KeyError:
+            pass
+        return value
+    
+    def _put_in_cache(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()):
+        """
+        Put value in cache
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds (defaults to the catalog-wide cache_ttl)
+            tags: Invalidation tags, e.g. "schema:<id>" or "asset_type:<id>"
+        """
+        ttl = ttl or self.cache_ttl
+        if self.shared_cache is not None:
+            self.shared_cache.set(key, value, ttl, tags)
+        self._put_in_local_cache(key, value, tags, ttl)
+    
+    def _get_from_shared_cache(self, key: str) -> Optional[Any]:
+        """
+        Fetch an entry missing locally from the shared cache and keep a local
+        copy for as long as the shared entry has left to live
+        """
+        if self.shared_cache is None:
+            return None
+        entry = self.shared_cache.get(key)
+        if entry is None:
+            return None
+        value, tags, remaining_ttl = entry
+        self._put_in_local_cache(key, value, tags, remaining_ttl)
+        return value
+    
+    def _put_in_local_cache(self, key: str, value: Any, tags: Iterable[str] = (), ttl: Optional[float] = None):
+        """Put value in this process's cache for ttl seconds (default cache_ttl)"""
         with self.lock:
-            if key not in self.cache:
-                return None
-            
-            # Check expiry
-            timestamp = self.cache_timestamps.get(key)
-            if timestamp:
-                age = (datetime.utcnow() - timestamp).total_seconds()
-                if age > self.cache_ttl:
-                    # Expired
-                    del self.cache[key]
-                    del self.cache_timestamps[key]
-                    return None
+            self._evict(key)
+            self.cache[key] = value
+            self.cache_expiry[key] = time.monotonic() + (ttl or self.cache_ttl)
+            if tags:
+                self.cache_tags[key] = tuple(tags)
+                for tag in tags:
+                    self.tag_index.setdefault(tag, set()).add(key)
             
-            return self.cache[key]
+            # Drop least recently used entries once over capacity
+            while len(self.cache) > self.max_entries:
+                self._evict(next(iter(self.cache)))
+    
+    def _evict(self, key: str):
+        """Remove a key from the cache and from the tag index (lock held by caller)"""
+        self.cache.pop(key, None)
+        self.cache_expiry.pop(key, None)
+        for tag in self.cache_tags.pop(key, ()):
+            keys = self.tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_index[tag]
     
-    def _put_in_cache(self, key: str, value: Any, ttl: Optional[int] = None):
-        """Put value in cache"""
+    def _invalidate_tags(self, tags: Iterable[str]):
+        """Remove every cache entry stored under any of the given tags"""
+        if self.shared_cache is not None:
+            self.shared_cache.delete_tags(tags)
+        self._invalidate_local_tags(tags)
+    
+    def _invalidate_local_tags(self, tags: Optional[Iterable[str]]):
+        """
+        Remove this process's entries stored under any of the given tags
+        (all entries if tags is None); also called for invalidations
+        published by other workers
+        """
         with self.lock:
-            self.cache[key] = value
-            self.cache_timestamps[key] = datetime.utcnow()
+            if tags is None:
+                self.cache.clear()
+                self.cache_expiry.clear()
+                self.cache_tags.clear()
+                self.tag_index.clear()
+                return
+            for tag in tags:
+                for key in self.tag_index.pop(tag, ()):
+                    self._evict(key)
+    
+    def _share_field_list(self, schema_data: Dict):
+        """
+        Seed the get_fields() entry for a schema from its freshly built dict
+        
+        The field dicts are shared by reference (only the list is re-sorted into
+        get_fields' order_index order), so they are built once per schema load
+        and a following get_fields() needs neither a query nor new dicts.
+        """
+        cache_key = f"fields:{schema_data['id']}:deleted:False"
+        if self._get_from_cache(cache_key) is not None:
+            return
+        
+        # NULL order_index sorts last, as ORDER BY does on PostgreSQL
+        fields_data = sorted(schema_data['fields'], key=lambda f: (f['order'] is None, f['order'] or 0))
+        self._put_in_cache(cache_key, fields_data, tags=(f"schema:{schema_data['id']}",))
     
     def _build_schema_dict(self, schema: SchemaModel) -> Dict:
         """Build complete schema dict"""
@@ -310,8 +460,8 @@ class MetadataCatalog:
             'is_active': schema.is_active,
             'created_by': schema.created_by,
             'created_at': schema.created_at.isoformat() if schema.created_at else None,
-            'fields': [self._build_field_dict(f) for f in schema.fields if not f.is_deleted],
-            'field_count': len([f for f in schema.fields if not f.is_deleted])
+            'fields': [self._build_field_dict(f) for f in schema.active_fields],
+            'field_count': len(schema.active_fields)
         }
     
     def _build_field_dict(self, field: SchemaField) -> Dict:
@@ -1,8 +1,13 @@
+from sqlalchemy import insert
 from jsonschema import validate, ValidationError
-from ..models import MetadataRecord, SchemaModel
+from ..models import MetadataRecord, SchemaModel, SchemaField, FieldValue
 from ..extensions import db
 
 
+# Records inserted per batch by MetadataService.create_records
+IMPORT_CHUNK_SIZE = 1000
+
+
 def validate_metadata_against_schema(metadata: dict, schema_id: int):
     schema = SchemaModel.query.get(schema_id)
     if not schema:
@@ -23,3 +28,164 @@ def create_metadata_record(metadata_json: dict, schema_id: int = None, asset_typ
     db.session.add(r)
     db.session.commit()
     return r, None
+
+
+class MetadataService:
+    """Create metadata records with their typed field values"""
+    
+    def create_record(self, schema_id: int, name: str, field_values: dict, created_by: int = None,
+                      asset_type_id: int = None, tag: str = None, autocommit: bool = True) -> MetadataRecord:
+        """
+        Create a metadata record and its field values
+        
+        Values for fields the schema doesn't define are skipped.
+        
+        Args:
+            schema_id: Schema the record belongs to
+            name: Record name
+            field_values: Dict of field_name -> value
+            created_by: User ID
+            asset_type_id: Asset type ID (defaults to the schema's)
+            tag: Optional tag
+            autocommit: Commit when done; pass False to leave the record in the
+                caller's transaction
+        
+        Returns:
+            Created MetadataRecord
+        """
+        schema = SchemaModel.query.get(schema_id)
+        if not schema:
+            raise ValueError(f"Schema {schema_id} not found")
+        
+        record = MetadataRecord(
+            name=name,
+            schema_id=schema.id,
+            asset_type_id=asset_type_id or schema.asset_type_id,
+            created_by=created_by,
+            tag=tag,
+        )
+        db.session.add(record)
+        db.session.flush()
+        
+        self._insert_field_values(self._active_fields(schema_id), [record.id], [field_values])
+        
+        if autocommit:
+            db.session.commit()
+        
+        return record
+    
+    def create_records(self, schema_id: int, records: list, created_by: int = None,
+                       chunk_size: int = IMPORT_CHUNK_SIZE):
+        """
+        Create many metadata records in batches
+        
+        Each chunk is written inside a savepoint as one batch of record INSERTs
+        (one multi-row INSERT ... RETURNING id where the database supports it)
+        plus one executemany INSERT for all of its field values.
+        If a chunk fails it is retried row by row so only the bad records are
+        reported. Nothing is committed; the caller commits once at the end.
+        
+        Args:
+            schema_id: Schema the records belong to
+            records: List of field_name -> value dicts; a 'name' key names the record
+            created_by: User ID
+            chunk_size: Records per batch
+        
+        Returns:
+            (created_ids, failures) where failures is a list of {'index', 'error'}
+        """
+        schema = SchemaModel.query.get(schema_id)
+        if not schema:
+            raise ValueError(f"Schema {schema_id} not found")
+        
+        fields = self._active_fields(schema_id)
+        created_ids = []
+        failures = []
+        
+        for start in range(0, len(records), chunk_size):
+            chunk = [
+                (record_data.get('name', f'Imported Record {idx + 1}'), record_data)
+                for idx, record_data in enumerate(records[start:start + chunk_size], start)
+            ]
+            try:
+                with db.session.begin_nested():
+                    inserted = self._insert_records(schema, fields, chunk, created_by)
+                created_ids.extend(inserted)
+            except Exception:
+                # Isolate the failing rows
+                for idx, row in enumerate(chunk, start):
+                    try:
+                        with db.session.begin_nested():
+                            inserted = self._insert_records(schema, fields, [row], created_by)
+                        created_ids.append(inserted[0])
+                    except Exception as e:
+                        failures.append({'index': idx, 'error': str(e)})
+        
+        return created_ids, failures
+    
+    def _active_fields(self, schema_id: int) -> dict:
+        """Map field_name -> SchemaField for the schema's active fields"""
+        return {f.field_name: f for f in SchemaField.query.filter_by(schema_id=schema_id, is_deleted=False).all()}
+    
+    def _insert_records(self, schema, fields: dict, rows: list, created_by: int = None) -> list:
+        """
+        Insert (name, values) rows as records with their field values
+        
+        Values for fields the schema doesn't define are skipped.
+        
+        Returns:
+            IDs of the new records, in row order
+        """
+        record_ids = self._insert_record_rows(schema, [name for name, _ in rows], created_by)
+        self._insert_field_values(fields, record_ids, [field_values for _, field_values in rows])
+        return record_ids
+    
+    def _insert_record_rows(self, schema, names: list, created_by: int = None) -> list:
+        """
+        Insert bare MetadataRecord rows and return their IDs in order
+        
+        Uses INSERT ... RETURNING id when the dialect can return executemany
+        rows in parameter order (SQLAlchemy 2.0.10+ on PostgreSQL, SQLite,
+        MariaDB), so no ORM objects are built; otherwise falls back to an ORM
+        flush, which assigns the IDs.
+        """
+        if getattr(db.engine.dialect, 'insert_executemany_returning_sort_by_parameter_order', False):
+            stmt = insert(MetadataRecord).returning(MetadataRecord.id, sort_by_parameter_order=True)
+            return list(db.session.scalars(stmt, [
+                {
+                    'name': name,
+                    'schema_id': schema.id,
+                    'asset_type_id': schema.asset_type_id,
+                    'created_by': created_by,
+                }
+                for name in names
+            ]))
+        
+        records = [
+            MetadataRecord(
+                name=name,
+                schema_id=schema.id,
+                asset_type_id=schema.asset_type_id,
+                created_by=created_by,
+            )
+            for name in names
+        ]
+        db.session.add_all(records)
+        db.session.flush()
+        return [record.id for record in records]
+    
+    def _insert_field_values(self, fields: dict, record_ids: list, values_list: list):
+        """Insert the field values of each record with one executemany INSERT"""
+        value_rows = []
+        for record_id, field_values in zip(record_ids, values_list):
+            # Only names present on both sides; intersecting the key views
+            # skips a Python-level lookup per unknown key
+            for field_name in field_values.keys() & fields.keys():
+                field = fields[field_name]
+                row = FieldValue.value_columns(field.field_type, field_values[field_name])
+                row['record_id'] = record_id
+                row['schema_field_id'] = field.id
+                value_rows.append(row)
+        
+        if value_rows:
+            db.session.execute(insert(FieldValue), value_rows)
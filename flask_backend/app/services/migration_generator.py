@@ -3,8 +3,59 @@ MigrationGenerator - Generate SQL migration scripts for schema changes
 """
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from ..models import SchemaModel, SchemaField, SchemaVersion
+import orjson
+from ..models import SchemaModel, SchemaField, SchemaVersion, MetadataRecord, FieldValue
+from ..extensions import db
 from .schema_version_control import SchemaVersionControl
+from .validation_engine import ValidationEngine
+
+# Field type -> SQL column type, per dialect (unknown dialects use postgresql)
+SQL_TYPE_MAP = {
+    'postgresql': {
+        'string': 'TEXT',
+        'integer': 'INTEGER',
+        'float': 'DOUBLE PRECISION',
+        'boolean': 'BOOLEAN',
+        'date': 'TIMESTAMP',
+        'json': 'JSONB',
+        'array': 'JSONB',
+        'object': 'JSONB'
+    },
+    'mysql': {
+        'string': 'TEXT',
+        'integer': 'INT',
+        'float': 'DOUBLE',
+        'boolean': 'BOOLEAN',
+        'date': 'DATETIME',
+        'json': 'JSON',
+        'array': 'JSON',
+        'object': 'JSON'
+    },
+    'sqlite': {
+        'string': 'TEXT',
+        'integer': 'INTEGER',
+        'float': 'REAL',
+        'boolean': 'INTEGER',
+        'date': 'TEXT',
+        'json': 'TEXT',
+        'array': 'TEXT',
+        'object': 'TEXT'
+    }
+}
+
+
+def _format_json_default(value: Any) -> str:
+    return f"'{orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()}'"
+
+
+# Field type -> SQL literal formatter for column defaults (other types use str)
+DEFAULT_FORMATTERS = {
+    'string': lambda value: f"'{value}'",
+    'boolean': lambda value: 'TRUE' if value else 'FALSE',
+    'json': _format_json_default,
+    'array': _format_json_default,
+    'object': _format_json_default,
+}
 
 
 class MigrationGenerator:
@@ -37,9 +88,10 @@ class MigrationGenerator:
         if from_version == to_version:
             return "-- No migration needed (same version)"
         
-        # Get version snapshots
-        from_snap = self.version_control.get_version(schema_id, from_version)
-        to_snap = self.version_control.get_version(schema_id, to_version)
+        # Get both version snapshots in one query
+        versions = self.version_control.get_versions(schema_id, [from_version, to_version])
+        from_snap = versions.get(from_version)
+        to_snap = versions.get(to_version)
         
         if not from_snap or not to_snap:
             raise ValueError("Version not found")
@@ -50,51 +102,51 @@ class MigrationGenerator:
             to_snap['schema_snapshot']
         )
         
-        # Generate script
-        script = self._generate_script_header(
+        # Generate script (statements collected in a list, joined once)
+        parts = [self._generate_script_header(
             schema_id, from_version, to_version, diff
-        )
+        )]
         
-        script += "\nBEGIN TRANSACTION;\n\n"
+        parts.append("\nBEGIN TRANSACTION;\n\n")
         
         # Generate statements for each change
         table_name = f"metadata_record_{schema_id}"  # Virtual table name
         
+        # Field definitions by name, so each change is one lookup (first
+        # definition wins, as with the previous linear scan)
+        from_fields = {}
+        for f in from_snap['schema_snapshot']['fields']:
+            from_fields.setdefault(f['name'], f)
+        to_fields = {}
+        for f in to_snap['schema_snapshot']['fields']:
+            to_fields.setdefault(f['name'], f)
+        
         # Add new fields
         for field_name in diff['added_fields']:
-            field_def = next(
-                (f for f in to_snap['schema_snapshot']['fields'] if f['name'] == field_name),
-                None
-            )
+            field_def = to_fields.get(field_name)
             if field_def:
-                script += self._generate_add_field_sql(
+                parts.append(self._generate_add_field_sql(
                     table_name, field_def, dialect
-                )
+                ))
         
         # Modify existing fields
         for field_name, changes in diff['modified_fields'].items():
-            from_field = next(
-                (f for f in from_snap['schema_snapshot']['fields'] if f['name'] == field_name),
-                None
-            )
-            to_field = next(
-                (f for f in to_snap['schema_snapshot']['fields'] if f['name'] == field_name),
-                None
-            )
+            from_field = from_fields.get(field_name)
+            to_field = to_fields.get(field_name)
             if from_field and to_field:
-                script += self._generate_modify_field_sql(
+                parts.append(self._generate_modify_field_sql(
                     table_name, from_field, to_field, dialect
-                )
+                ))
         
         # Remove fields
         for field_name in diff['removed_fields']:
-            script += self._generate_remove_field_sql(
+            parts.append(self._generate_remove_field_sql(
                 table_name, field_name, dialect
-            )
+            ))
         
-        script += "\nCOMMIT;\n"
+        parts.append("\nCOMMIT;\n")
         
-        return script
+        return "".join(parts)
     
     def generate_rollback_script(
         self,
@@ -156,28 +208,30 @@ class MigrationGenerator:
         
         table_name = f"metadata_record_{schema_id}"
         
-        script = f"-- Full schema DDL for {schema.name} (v{schema.version})\n"
-        script += f"-- Generated on {datetime.utcnow().isoformat()}\n\n"
-        
-        script += f"CREATE TABLE {table_name} (\n"
-        script += "    id SERIAL PRIMARY KEY,\n"
-        script += "    record_id INTEGER NOT NULL,\n"
+        parts = [
+            f"-- Full schema DDL for {schema.name} (v{schema.version})\n",
+            f"-- Generated on {datetime.utcnow().isoformat()}\n\n",
+            f"CREATE TABLE {table_name} (\n",
+            "    id SERIAL PRIMARY KEY,\n",
+            "    record_id INTEGER NOT NULL,\n",
+        ]
         
+        sql_types = SQL_TYPE_MAP.get(dialect, SQL_TYPE_MAP['postgresql'])
         for field in fields:
-            sql_type = self._get_sql_type(field.field_type, dialect)
+            sql_type = sql_types.get(field.field_type, 'TEXT')
             nullable = "NOT NULL" if field.is_required else "NULL"
             default = f" DEFAULT {self._format_default(field.default_value, field.field_type)}" if field.default_value else ""
             
-            script += f"    {field.field_name} {sql_type} {nullable}{default},\n"
+            parts.append(f"    {field.field_name} {sql_type} {nullable}{default},\n")
         
-        script += "    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,\n"
-        script += "    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP\n"
-        script += ");\n\n"
+        parts.append("    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,\n")
+        parts.append("    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP\n")
+        parts.append(");\n\n")
         
         # Add indexes
-        script += f"CREATE INDEX idx_{table_name}_record_id ON {table_name}(record_id);\n"
+        parts.append(f"CREATE INDEX idx_{table_name}_record_id ON {table_name}(record_id);\n")
         
-        return script
+        return "".join(parts)
     
     def generate_data_migration(
         self,
@@ -200,24 +254,28 @@ class MigrationGenerator:
             schema_id, from_version, to_version
         )
         
-        script = f"-- Data migration from v{from_version} to v{to_version}\n\n"
-        script += "BEGIN TRANSACTION;\n\n"
+        parts = [
+            f"-- Data migration from v{from_version} to v{to_version}\n\n",
+            "BEGIN TRANSACTION;\n\n",
+        ]
         
         # Handle type changes that need data conversion
         for field_name, changes in diff_result.get('modified_fields', {}).items():
             if any('type:' in change for change in changes):
-                script += f"-- Convert {field_name} data type\n"
-                script += f"-- Review and adjust conversion logic as needed\n"
-                script += f"UPDATE field_values\n"
-                script += f"SET value_text = CAST(value_int AS TEXT)\n"
-                script += f"WHERE schema_field_id IN (\n"
-                script += f"    SELECT id FROM schema_fields\n"
-                script += f"    WHERE schema_id = {schema_id} AND field_name = '{field_name}'\n"
-                script += f");\n\n"
-        
-        script += "COMMIT;\n"
-        
-        return script
+                parts.append(
+                    f"-- Convert {field_name} data type\n"
+                    "-- Review and adjust conversion logic as needed\n"
+                    "UPDATE field_values\n"
+                    "SET value_text = CAST(value_int AS TEXT)\n"
+                    "WHERE schema_field_id IN (\n"
+                    "    SELECT id FROM schema_fields\n"
+                    f"    WHERE schema_id = {schema_id} AND field_name = '{field_name}'\n"
+                    ");\n\n"
+                )
+        
+        parts.append("COMMIT;\n")
+        
+        return "".join(parts)
     
     # Private helper methods
     
@@ -305,55 +363,14 @@ class MigrationGenerator:
     
     def _get_sql_type(self, field_type: str, dialect: str) -> str:
         """Map field type to SQL type"""
-        type_map = {
-            'postgresql': {
-                'string': 'TEXT',
-                'integer': 'INTEGER',
-                'float': 'DOUBLE PRECISION',
-                'boolean': 'BOOLEAN',
-                'date': 'TIMESTAMP',
-                'json': 'JSONB',
-                'array': 'JSONB',
-                'object': 'JSONB'
-            },
-            'mysql': {
-                'string': 'TEXT',
-                'integer': 'INT',
-                'float': 'DOUBLE',
-                'boolean': 'BOOLEAN',
-                'date': 'DATETIME',
-                'json': 'JSON',
-                'array': 'JSON',
-                'object': 'JSON'
-            },
-            'sqlite': {
-                'string': 'TEXT',
-                'integer': 'INTEGER',
-                'float': 'REAL',
-                'boolean': 'INTEGER',
-                'date': 'TEXT',
-                'json': 'TEXT',
-                'array': 'TEXT',
-                'object': 'TEXT'
-            }
-        }
-        
-        return type_map.get(dialect, type_map['postgresql']).get(field_type, 'TEXT')
+        return SQL_TYPE_MAP.get(dialect, SQL_TYPE_MAP['postgresql']).get(field_type, 'TEXT')
     
     def _format_default(self, value: Any, field_type: str) -> str:
         """Format default value for SQL"""
         if value is None:
             return 'NULL'
         
-        if field_type == 'string':
-            return f"'{value}'"
-        elif field_type == 'boolean':
-            return 'TRUE' if value else 'FALSE'
-        elif field_type in ('json', 'array', 'object'):
-            import json
-            return f"'{json.dumps(value)}'"
-        else:
-            return str(value)
+        return DEFAULT_FORMATTERS.get(field_type, str)(value)
 
 
 class ImpactAnalyzer:
@@ -367,8 +384,6 @@ class ImpactAnalyzer:
         field_def: Dict
     ) -> Dict[str, Any]:
         """Analyze impact of adding a field"""
-        from ..models import MetadataRecord
-        
         record_count = MetadataRecord.query.filter_by(schema_id=schema_id).count()
         
         return {
@@ -401,8 +416,6 @@ class ImpactAnalyzer:
         if not field:
             return {'error': 'Field not found'}
         
-        from ..models import FieldValue
-        
         value_count = FieldValue.query.filter_by(schema_field_id=field.id).count()
         non_null_count = db.session.query(db.func.count(FieldValue.id)).filter(
             FieldValue.schema_field_id == field.id,
@@ -447,9 +460,6 @@ class ImpactAnalyzer:
         if not field:
             return {'error': 'Field not found'}
         
-        from ..models import FieldValue
-        from .validation_engine import ValidationEngine
-        
         validator = ValidationEngine()
         validation_errors = validator.validate_type_change(
             field.id, field.field_type, new_type
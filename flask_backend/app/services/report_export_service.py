@@ -5,8 +5,10 @@ Handles CSV and PDF generation
 import os
 import csv
 import io
+from itertools import islice
 from typing import List, Dict
 from datetime import datetime
+from functools import lru_cache
 from reportlab.lib.pagesizes import letter, A4, landscape
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -14,6 +16,92 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 
+# Write buffer for CSV exports (fewer write syscalls on large reports)
+CSV_WRITE_BUFFER = 1024 * 1024
+
+# Rows encoded per chunk by iter_csv (one writerows call and one encode each)
+CSV_STREAM_ROWS = 1024
+
+# Data rows per PDF table; ReportLab's layout time grows faster than
+# linearly with table length, so long reports are split into stacked tables
+# (even, so the alternating row colours carry on across tables)
+PDF_TABLE_ROWS = 50
+
+# Paragraph styles, the same for every export (only read, never modified)
+PDF_STYLES = getSampleStyleSheet()
+PDF_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=PDF_STYLES['Heading1'],
+    fontSize=18,
+    textColor=colors.HexColor('#1976d2'),
+    spaceAfter=30,
+    alignment=TA_CENTER
+)
+
+# Style of the data table, identical for every export; TableStyle is only
+# read by setStyle, so one instance is shared
+DATA_TABLE_STYLE = TableStyle([
+    # Header styling
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1976d2')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('TOPPADDING', (0, 0), (-1, 0), 12),
+    
+    # Data rows styling
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('ALIGN', (0, 1), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('TOPPADDING', (0, 1), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+    
+    # Alternating row colors
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')]),
+    
+    # Grid
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+
+def _csv_rows(data: List[Dict], fields: List[str]):
+    """
+    Positional CSV rows for the given fields
+    
+    Values go to the csv writer untouched: it already writes None as an
+    empty string and anything else (dicts/lists included) as its str(), so
+    no per-cell type checks are needed here.
+    """
+    for row in data:
+        yield map(row.get, fields)
+
+
+@lru_cache(maxsize=1024)
+def _column_label(field: str) -> str:
+    """Default PDF column header for a field ('camera_model' -> 'Camera Model')"""
+    return field.replace('_', ' ').title()
+
+
+def _pdf_cell(value) -> str:
+    """
+    Table cell text for a PDF export
+    
+    None becomes an empty string; long dicts/lists are cut to 50 characters
+    plus '...', other long values to 47 plus '...'.
+    """
+    if value is None:
+        return ''
+    text = str(value)
+    if len(text) > 50:
+        if isinstance(value, (dict, list)):
+            return text[:50] + '...'
+        return text[:47] + '...'
+    return text
+
 
 class ReportExportService:
     """Export reports to CSV and PDF formats"""
@@ -36,27 +124,44 @@ class ReportExportService:
         """
         filepath = os.path.join(self.reports_dir, filename)
         
-        # Use all fields if none specified
+        with open(filepath, 'wb', buffering=CSV_WRITE_BUFFER) as csvfile:
+            for chunk in self.iter_csv(data, fields):
+                csvfile.write(chunk)
+        
+        return filepath
+    
+    def iter_csv(self, data: List[Dict], fields: List[str]):
+        """
+        Generate CSV content as encoded chunks
+        
+        The same bytes export_csv writes (UTF-8 with BOM), produced
+        incrementally so a response can stream them without the whole file
+        being built in memory first.
+        
+        Args:
+            data: List of record dictionaries
+            fields: List of field names to include
+        
+        Yields:
+            UTF-8 encoded CSV chunks
+        """
         if not fields and data:
             fields = list(data[0].keys())
         
-        with open(filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fields, extrasaction='ignore')
-            writer.writeheader()
-            for row in data:
-                # Convert None to empty string and ensure all values are serializable
-                clean_row = {}
-                for key in fields:
-                    value = row.get(key)
-                    if value is None:
-                        clean_row[key] = ''
-                    elif isinstance(value, (dict, list)):
-                        clean_row[key] = str(value)
-                    else:
-                        clean_row[key] = value
-                writer.writerow(clean_row)
-        
-        return filepath
+        buffer = io.StringIO()
+        # Plain csv.writer fed positional rows: no per-row dict for
+        # DictWriter to map back onto the field order
+        writer = csv.writer(buffer)
+        buffer.write('\ufeff')
+        writer.writerow(fields)
+        rows = _csv_rows(data, fields)
+        while True:
+            writer.writerows(islice(rows, CSV_STREAM_ROWS))
+            if not buffer.tell():
+                return
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
     
     def export_pdf(self, data: List[Dict], fields: List[str], pdf_config: dict, filename: str) -> str:
         """
@@ -97,21 +202,10 @@ class ReportExportService:
         )
         
         elements = []
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor=colors.HexColor('#1976d2'),
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
         
         # Title
         title = pdf_config.get('title', 'Report')
-        title_para = Paragraph(f"<b>{title}</b>", title_style)
+        title_para = Paragraph(f"<b>{title}</b>", PDF_TITLE_STYLE)
         elements.append(title_para)
         
         # Metadata section
@@ -123,7 +217,7 @@ class ReportExportService:
             if pdf_config.get('filters'):
                 meta_text += f"<b>Filters Applied:</b> {len(pdf_config['filters'])}<br/>"
             
-            meta_para = Paragraph(meta_text, styles['Normal'])
+            meta_para = Paragraph(meta_text, PDF_STYLES['Normal'])
             elements.append(meta_para)
             elements.append(Spacer(1, 0.3*inch))
         
@@ -133,68 +227,33 @@ class ReportExportService:
         
         # Get column labels
         column_labels = pdf_config.get('column_labels', {})
-        headers = [column_labels.get(f, f.replace('_', ' ').title()) for f in fields]
-        
-        table_data = [headers]  # Header row
-        
-        for row in data:
-            table_row = []
-            for field in fields:
-                value = row.get(field, '')
-                if value is None:
-                    value = ''
-                elif isinstance(value, (dict, list)):
-                    value = str(value)[:50] + '...' if len(str(value)) > 50 else str(value)
-                else:
-                    value = str(value)
-                    if len(value) > 50:
-                        value = value[:47] + '...'
-                table_row.append(value)
-            table_data.append(table_row)
-        
-        # Calculate column widths
+        headers = [column_labels[f] if f in column_labels else _column_label(f) for f in fields]
+        
+        rows = [
+            [_pdf_cell(value) for value in map(row.get, fields)]
+            for row in data
+        ]
+        
+        # Calculate column widths (shared by every table)
         available_width = doc.width
         num_cols = len(fields)
         col_width = available_width / num_cols
         col_widths = [col_width] * num_cols
         
-        # Create table
-        table = Table(table_data, colWidths=col_widths, repeatRows=1)
-        
-        # Table style
-        table.setStyle(TableStyle([
-            # Header styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1976d2')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('TOPPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data rows styling
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('ALIGN', (0, 1), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('TOPPADDING', (0, 1), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-            
-            # Alternating row colors
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f5f5f5')]),
-            
-            # Grid
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
-        
-        elements.append(table)
+        # Create tables of at most PDF_TABLE_ROWS rows, each with the header
+        for start in range(0, max(len(rows), 1), PDF_TABLE_ROWS):
+            table = Table(
+                [headers] + rows[start:start + PDF_TABLE_ROWS],
+                colWidths=col_widths,
+                repeatRows=1
+            )
+            table.setStyle(DATA_TABLE_STYLE)
+            elements.append(table)
         
         # Footer
         elements.append(Spacer(1, 0.3*inch))
         footer_text = f"<i>End of report - {len(data)} records</i>"
-        footer_para = Paragraph(footer_text, styles['Normal'])
+        footer_para = Paragraph(footer_text, PDF_STYLES['Normal'])
         elements.append(footer_para)
         
         # Build PDF
@@ -5,7 +5,7 @@ Orchestrates report generation
 import os
 import time
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 from ..models import ReportTemplate, ReportExecution, SchemaModel
 from ..extensions import db
 from .report_query_builder import ReportQueryBuilder
@@ -93,7 +93,7 @@ class ReportGenerator:
             execution.status = 'completed'
             execution.row_count = len(data)
             execution.file_path = filepath
-            execution.file_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+            execution.file_size = self._file_size(filepath)
             execution.execution_time_ms = int((time.time() - start_time) * 1000)
             
         except Exception as e:
@@ -174,7 +174,7 @@ class ReportGenerator:
             execution.status = 'completed'
             execution.row_count = len(data)
             execution.file_path = filepath
-            execution.file_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+            execution.file_size = self._file_size(filepath)
             execution.execution_time_ms = int((time.time() - start_time) * 1000)
             
         except Exception as e:
@@ -187,6 +187,30 @@ class ReportGenerator:
         
         return execution
     
+    def stream_adhoc_csv(self, schema_id: int, query_config: Dict) -> Iterator[bytes]:
+        """
+        Run an ad-hoc query and return its CSV as encoded chunks
+        
+        Nothing is written to disk and no execution is recorded; the query
+        runs before this returns, only the CSV encoding is left to the
+        iterator.
+        
+        Args:
+            schema_id: Schema to query
+            query_config: Query configuration
+        
+        Returns:
+            Iterator of UTF-8 encoded CSV chunks
+        """
+        schema = SchemaModel.query.get(schema_id)
+        if not schema:
+            raise ValueError(f"Schema {schema_id} not found")
+        
+        query = self.query_builder.build_query(query_config, schema)
+        data = self.query_builder.execute_and_format(query, query_config, schema)
+        
+        return self.exporter.iter_csv(data, query_config.get('fields', []))
+    
     def _merge_params(self, base_config: dict, params: dict) -> dict:
         """Merge runtime parameters into base query config"""
         config = base_config.copy()
@@ -204,3 +228,10 @@ class ReportGenerator:
             config['fields'] = params['fields']
         
         return config
+    
+    def _file_size(self, filepath: str) -> int:
+        """Size of the exported file in bytes (0 if missing), from a single stat call"""
+        try:
+            return os.stat(filepath).st_size
+        except OSError:
+            return 0
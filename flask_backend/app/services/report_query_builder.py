@@ -64,7 +64,7 @@ class ReportQueryBuilder:
             return self._apply_record_field_filter(query, field_name, operator, value)
         
         # Filter on dynamic fields
-        field = next((f for f in schema.fields if f.field_name == field_name and not f.is_deleted), None)
+        field = next((f for f in schema.active_fields if f.field_name == field_name), None)
         if not field:
             return query
         
@@ -166,10 +166,22 @@ class ReportQueryBuilder:
         fields = query_config.get('fields', [])
         if not fields:
             # If no fields specified, include all non-deleted fields
-            fields = [f.field_name for f in schema.fields if not f.is_deleted]
+            fields = [f.field_name for f in schema.active_fields]
+        
+        # Field definitions resolved once, not rescanned for every record
+        fields_by_name = {f.field_name: f for f in schema.active_fields}
+        
+        # (output name, field id) of each requested schema field, worked out
+        # once; record columns are already included and unknown names skipped
+        value_fields = [
+            (field_name, fields_by_name[field_name].id)
+            for field_name in fields
+            if field_name not in ('id', 'name', 'created_at') and field_name in fields_by_name
+        ]
         
         results = []
         for record in records:
+            values_by_field = {v.schema_field_id: v for v in record.field_values}
             row = {
                 'id': record.id,
                 'name': record.name,
@@ -177,17 +189,9 @@ class ReportQueryBuilder:
             }
             
             # Get field values
-            for field_name in fields:
-                if field_name in ['id', 'name', 'created_at']:
-                    continue  # Already included
-                
-                field = next((f for f in schema.fields if f.field_name == field_name and not f.is_deleted), None)
-                if field:
-                    value_obj = next((v for v in record.field_values if v.schema_field_id == field.id), None)
-                    if value_obj:
-                        row[field_name] = value_obj.get_value()
-                    else:
-                        row[field_name] = None
+            for field_name, field_id in value_fields:
+                value_obj = values_by_field.get(field_id)
+                row[field_name] = value_obj.get_value() if value_obj is not None else None
             
             results.append(row)
         
@@ -5,6 +5,7 @@ Handles creation, modification, and deletion of schema fields at runtime
 import threading
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from sqlalchemy import insert
 from ..models import SchemaModel, SchemaField, MetadataRecord, FieldValue, ChangeLog, SchemaVersion
 from ..extensions import db
 from .validation_engine import ValidationEngine
@@ -80,19 +81,23 @@ class SchemaManager:
                 db.session.add(schema)
                 db.session.flush()  # Get schema ID
                 
-                # Add fields
-                for idx, field_def in enumerate(fields):
-                    field = SchemaField(
-                        schema_id=schema.id,
-                        field_name=field_def['name'],
-                        field_type=field_def.get('type', 'string'),
-                        is_required=field_def.get('required', False),
-                        default_value=field_def.get('default'),
-                        constraints=field_def.get('constraints'),
-                        description=field_def.get('description'),
-                        order_index=idx
-                    )
-                    db.session.add(field)
+                # Add fields as one multi-row INSERT
+                if fields:
+                    db.session.execute(insert(SchemaField), [
+                        {
+                            'schema_id': schema.id,
+                            'field_name': field_def['name'],
+                            'field_type': field_def.get('type', 'string'),
+                            'is_required': field_def.get('required', False),
+                            'default_value': field_def.get('default'),
+                            'constraints': field_def.get('constraints'),
+                            'description': field_def.get('description'),
+                            'order_index': idx,
+                        }
+                        for idx, field_def in enumerate(fields)
+                    ])
+                    # Rows went in outside the unit of work; reload on next access
+                    db.session.expire(schema, ['fields'])
                 
                 # Create change log
                 log = ChangeLog(
@@ -518,6 +523,10 @@ class SchemaManager:
         user_id: int
     ):
         """Create a version snapshot"""
+        # Field changes don't touch the schema row itself, so bump it here
+        # to let updated_at-keyed caches see the new version
+        schema.updated_at = datetime.utcnow()
+        
         latest_version = SchemaVersion.query.filter_by(schema_id=schema.id).order_by(
             SchemaVersion.version_number.desc()
         ).first()
@@ -1,18 +1,97 @@
+import threading
+import time
 from typing import Optional, Tuple, List, Dict
+from sqlalchemy.orm import selectinload
 from ..models import SchemaModel, SchemaField
 from ..extensions import db
 
 
+# Candidate schema summaries per asset type are reused for this many seconds
+CANDIDATE_CACHE_TTL = 30
+
+# asset_type_id -> (loaded_at, candidates)
+_candidate_cache: Dict[Optional[int], Tuple[float, List[Dict]]] = {}
+_candidate_lock = threading.Lock()
+
+# Python type -> schema field type for metadata values. bool precedes int so
+# the isinstance fallback (for subclasses) still maps True/False to boolean.
+PY_FIELD_TYPES = {
+    bool: "boolean",
+    int: "integer",
+    float: "float",
+    list: "array",
+    dict: "object",
+    str: "string",
+}
+
+
+def infer_field_type(value) -> str:
+    """Schema field type for a metadata value ("string" for anything unknown)"""
+    field_type = PY_FIELD_TYPES.get(type(value))
+    if field_type is not None:
+        return field_type
+    for py_type, field_type in PY_FIELD_TYPES.items():
+        if isinstance(value, py_type):
+            return field_type
+    return "string"
+
+
+def get_candidate_schemas(asset_type_id: Optional[int] = None) -> List[Dict]:
+    """
+    Return summaries (id, name, version, asset_type_id, active field names) of
+    the schemas that can match incoming metadata, optionally for one asset type.
+
+    Results are cached for CANDIDATE_CACHE_TTL seconds so repeated uploads for
+    the same asset type don't re-query every schema; schema changes clear the
+    cache through MetadataCatalog invalidation. Treat the result as read-only.
+    """
+    key = asset_type_id or None
+    now = time.monotonic()
+    with _candidate_lock:
+        cached = _candidate_cache.get(key)
+        if cached is not None and now - cached[0] < CANDIDATE_CACHE_TTL:
+            return cached[1]
+
+    q = SchemaModel.query.options(selectinload(SchemaModel.fields))
+    if asset_type_id:
+        q = q.filter(SchemaModel.asset_type_id == asset_type_id)
+    candidates = [
+        {
+            "id": s.id,
+            "name": s.name,
+            "version": s.version,
+            "asset_type_id": s.asset_type_id,
+            "fields": tuple(f.field_name for f in s.active_fields),
+        }
+        for s in q.all()
+    ]
+
+    with _candidate_lock:
+        _candidate_cache[key] = (now, candidates)
+    return candidates
+
+
+def clear_candidate_cache():
+    """Drop all cached candidate schemas."""
+    with _candidate_lock:
+        _candidate_cache.clear()
+
+
+def _field_overlap_score(field_names, incoming_keys) -> float:
+    """Share of incoming keys that are defined as fields."""
+    if not incoming_keys or not field_names:
+        return 0.0
+    # frozenset() of a frozenset is a no-op, so callers scoring many schemas
+    # can pass the keys pre-built
+    keys_set = frozenset(incoming_keys)
+    return len(keys_set.intersection(field_names)) / len(keys_set)
+
+
 def _schema_score_from_fields(schema: SchemaModel, incoming_keys: List[str]) -> float:
     """Compute overlap score between incoming metadata keys and defined schema fields."""
     if not incoming_keys:
         return 0.0
-    field_names = {f.field_name for f in schema.fields if not f.is_deleted}
-    if not field_names:
-        return 0.0
-    keys_set = set(incoming_keys)
-    common = keys_set.intersection(field_names)
-    return len(common) / len(keys_set) if keys_set else 0.0
+    return _field_overlap_score({f.field_name for f in schema.active_fields}, incoming_keys)
 
 
 def _schema_score(schema_json: dict, metadata_json: dict) -> float:
@@ -33,19 +112,18 @@ def find_best_schema_from_keys(
     min_score: float = 0.6,
 ) -> Tuple[Optional[SchemaModel], float]:
     """Return best matching schema (field-based) optionally filtered by asset type."""
-    q = SchemaModel.query
-    if asset_type_id:
-        q = q.filter(SchemaModel.asset_type_id == asset_type_id)
-    schemas = q.all()
-    best_schema = None
+    keys_set = frozenset(incoming_keys)
+    best_id = None
     best_score = 0.0
-    for schema in schemas:
-        score = _schema_score_from_fields(schema, incoming_keys)
+    for candidate in get_candidate_schemas(asset_type_id):
+        score = _field_overlap_score(candidate["fields"], keys_set)
         if score > best_score:
-            best_schema = schema
+            best_id = candidate["id"]
             best_score = score
     if best_score >= min_score:
-        return best_schema, best_score
+        best_schema = SchemaModel.query.get(best_id)
+        if best_schema is not None:
+            return best_schema, best_score
     return None, 0.0
 
 
@@ -59,25 +137,12 @@ def create_schema_from_metadata(
     """Create a dynamic schema using SchemaManager based on metadata keys and inferred types."""
     from .schema_manager import SchemaManager
 
-    def infer_type(v) -> str:
-        if isinstance(v, bool):
-            return "boolean"
-        if isinstance(v, int) and not isinstance(v, bool):
-            return "integer"
-        if isinstance(v, float):
-            return "float"
-        if isinstance(v, list):
-            return "array"
-        if isinstance(v, dict):
-            return "object"
-        return "string"
-
     fields = []
     if isinstance(metadata, dict):
         for k, v in metadata.items():
             fields.append({
                 "name": k,
-                "type": infer_type(v),
+                "type": infer_field_type(v),
                 "required": False
             })
 
@@ -3,6 +3,7 @@ SchemaVersionControl - Manage schema versions and rollbacks
 """
 from typing import List, Dict, Optional, Any
 from datetime import datetime
+from sqlalchemy import insert, update, delete
 from ..models import SchemaModel, SchemaField, SchemaVersion, ChangeLog, FieldValue
 from ..extensions import db
 from .metadata_catalog import MetadataCatalog
@@ -37,6 +38,24 @@ class SchemaVersionControl:
         
         return version.to_dict()
     
+    def get_versions(self, schema_id: int, version_numbers: List[int]) -> Dict[int, Dict]:
+        """
+        Get several versions of a schema in one query
+        
+        Args:
+            schema_id: Schema ID
+            version_numbers: Version numbers to load
+        
+        Returns:
+            Dict of version number -> version snapshot (missing versions are absent)
+        """
+        versions = SchemaVersion.query.filter(
+            SchemaVersion.schema_id == schema_id,
+            SchemaVersion.version_number.in_(set(version_numbers))
+        ).all()
+        
+        return {v.version_number: v.to_dict() for v in versions}
+    
     def get_latest_version(self, schema_id: int) -> Optional[Dict]:
         """Get the latest version of a schema"""
         version = SchemaVersion.query.filter_by(
@@ -86,20 +105,14 @@ class SchemaVersionControl:
         Returns:
             Diff dict with changes
         """
-        v1 = SchemaVersion.query.filter_by(
-            schema_id=schema_id,
-            version_number=version1
-        ).first()
-        
-        v2 = SchemaVersion.query.filter_by(
-            schema_id=schema_id,
-            version_number=version2
-        ).first()
+        versions = self.get_versions(schema_id, [version1, version2])
+        v1 = versions.get(version1)
+        v2 = versions.get(version2)
         
         if not v1 or not v2:
             raise ValueError("Version not found")
         
-        return self._calculate_diff(v1.schema_snapshot, v2.schema_snapshot)
+        return self._calculate_diff(v1['schema_snapshot'], v2['schema_snapshot'])
     
     def rollback(
         self,
@@ -153,82 +166,106 @@ class SchemaVersionControl:
             # Start transaction
             changes_made = []
             
+            target_fields = {f['name']: f for f in target.schema_snapshot['fields']}
+            
+            # Load every field of the schema in one query instead of one per change
+            existing_fields = {
+                f.field_name: f for f in SchemaField.query.filter_by(schema_id=schema_id).all()
+            }
+            
             # Handle removed fields (fields in target but not in current)
+            restore_ids = []
+            new_fields = []
             for field_name in diff['added_fields']:
                 # These were removed, need to restore or create
-                field_def = next(
-                    (f for f in target.schema_snapshot['fields'] if f['name'] == field_name),
-                    None
-                )
+                field_def = target_fields.get(field_name)
                 if field_def:
-                    # Check if soft deleted
-                    existing = SchemaField.query.filter_by(
-                        schema_id=schema_id,
-                        field_name=field_name,
-                        is_deleted=True
-                    ).first()
+                    existing = existing_fields.get(field_name)
                     
-                    if existing:
+                    if existing is not None and existing.is_deleted:
                         # Restore soft deleted field
-                        existing.is_deleted = False
+                        restore_ids.append(existing.id)
                         changes_made.append(f"Restored field '{field_name}'")
-                    else:
+                    elif existing is None:
                         # Create new field
-                        new_field = SchemaField(
-                            schema_id=schema_id,
-                            field_name=field_def['name'],
-                            field_type=field_def['type'],
-                            is_required=field_def['required'],
-                            default_value=field_def.get('default'),
-                            constraints=field_def.get('constraints'),
-                            description=field_def.get('description'),
-                            order_index=field_def.get('order', 0)
-                        )
-                        db.session.add(new_field)
+                        new_fields.append({
+                            'schema_id': schema_id,
+                            'field_name': field_def['name'],
+                            'field_type': field_def['type'],
+                            'is_required': field_def['required'],
+                            'default_value': field_def.get('default'),
+                            'constraints': field_def.get('constraints'),
+                            'description': field_def.get('description'),
+                            'order_index': field_def.get('order', 0),
+                            'is_deleted': False
+                        })
                         changes_made.append(f"Recreated field '{field_name}'")
             
+            if restore_ids:
+                db.session.execute(
+                    update(SchemaField)
+                    .where(SchemaField.id.in_(restore_ids))
+                    .values(is_deleted=False)
+                )
+            if new_fields:
+                db.session.execute(insert(SchemaField), new_fields)
+            
             # Handle added fields (fields in current but not in target)
+            remove_ids = []
             for field_name in diff['removed_fields']:
                 # These need to be removed
-                field = SchemaField.query.filter_by(
-                    schema_id=schema_id,
-                    field_name=field_name,
-                    is_deleted=False
-                ).first()
+                field = existing_fields.get(field_name)
                 
-                if field:
+                if field is not None and not field.is_deleted:
+                    remove_ids.append(field.id)
                     if preserve_data:
-                        # Soft delete
-                        field.is_deleted = True
                         changes_made.append(f"Soft deleted field '{field_name}'")
                     else:
-                        # Hard delete
-                        FieldValue.query.filter_by(schema_field_id=field.id).delete()
-                        db.session.delete(field)
                         changes_made.append(f"Deleted field '{field_name}' and all data")
             
+            if remove_ids:
+                if preserve_data:
+                    # Soft delete
+                    db.session.execute(
+                        update(SchemaField)
+                        .where(SchemaField.id.in_(remove_ids))
+                        .values(is_deleted=True)
+                    )
+                else:
+                    # Hard delete
+                    db.session.execute(
+                        delete(FieldValue).where(FieldValue.schema_field_id.in_(remove_ids))
+                    )
+                    db.session.execute(
+                        delete(SchemaField).where(SchemaField.id.in_(remove_ids))
+                    )
+            
             # Handle modified fields
+            reverted = []
             for field_name, changes in diff['modified_fields'].items():
-                field = SchemaField.query.filter_by(
-                    schema_id=schema_id,
-                    field_name=field_name,
-                    is_deleted=False
-                ).first()
+                field = existing_fields.get(field_name)
+                target_field = target_fields.get(field_name)
                 
-                if field:
-                    target_field = next(
-                        (f for f in target.schema_snapshot['fields'] if f['name'] == field_name),
-                        None
-                    )
-                    
-                    if target_field:
-                        field.field_type = target_field['type']
-                        field.is_required = target_field['required']
-                        field.default_value = target_field.get('default')
-                        field.constraints = target_field.get('constraints')
-                        field.description = target_field.get('description')
-                        field.order_index = target_field.get('order', 0)
-                        changes_made.append(f"Reverted field '{field_name}': {', '.join(changes)}")
+                if field is not None and not field.is_deleted and target_field:
+                    reverted.append({
+                        'id': field.id,
+                        'field_type': target_field['type'],
+                        'is_required': target_field['required'],
+                        'default_value': target_field.get('default'),
+                        'constraints': target_field.get('constraints'),
+                        'description': target_field.get('description'),
+                        'order_index': target_field.get('order', 0)
+                    })
+                    changes_made.append(f"Reverted field '{field_name}': {', '.join(changes)}")
+            
+            if reverted:
+                # Executemany UPDATE keyed on primary key
+                db.session.bulk_update_mappings(SchemaField, reverted)
+            
+            # Statements above bypassed the identity map
+            db.session.expire(schema, ['fields'])
+            
+            schema.updated_at = datetime.utcnow()
             
             # Create change log
             log = ChangeLog(
@@ -8,6 +8,13 @@ from ..models import SchemaField, FieldValue, MetadataRecord
 from ..extensions import db
 
 
+# Valid field identifier: letter or underscore, then alphanumerics/underscores
+IDENTIFIER_PATTERN = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+
+# Lowercased strings accepted as boolean field values
+BOOLEAN_STRINGS = frozenset(('true', 'false', '0', '1', 'yes', 'no'))
+
+
 class ValidationEngine:
     """
     Validates schema modifications before they are applied
@@ -217,11 +224,14 @@ class ValidationEngine:
         values = FieldValue.query.filter_by(schema_field_id=field_id).all()
         violations = []
         
+        # Compile the regex once instead of per value
+        pattern = re.compile(constraints['regex']) if 'regex' in constraints else None
+        
         for value in values:
             current_value = value.get_value()
             if current_value is not None:
                 violation = self._check_constraint_violation(
-                    current_value, field.field_type, constraints
+                    current_value, field.field_type, constraints, pattern
                 )
                 if violation:
                     violations.append(f"Record {value.record_id}: {violation}")
@@ -288,7 +298,7 @@ class ValidationEngine:
         if not name:
             return False
         # Must start with letter or underscore, contain only alphanumeric and underscore
-        return re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', name) is not None
+        return IDENTIFIER_PATTERN.match(name) is not None
     
     def _validate_constraints(
         self,
@@ -340,9 +350,15 @@ class ValidationEngine:
         self,
         value: Any,
         field_type: str,
-        constraints: Dict[str, Any]
+        constraints: Dict[str, Any],
+        pattern: Optional[re.Pattern] = None
     ) -> Optional[str]:
-        """Check if a value violates constraints"""
+        """
+        Check if a value violates constraints
+        
+        Args:
+            pattern: Precompiled constraints['regex'], for callers checking many values
+        """
         
         if field_type in ('integer', 'float'):
             if 'min' in constraints and value < constraints['min']:
@@ -355,8 +371,11 @@ class ValidationEngine:
                 return f"Length {len(value)} < min_length {constraints['min_length']}"
             if 'max_length' in constraints and len(value) > constraints['max_length']:
                 return f"Length {len(value)} > max_length {constraints['max_length']}"
-            if 'regex' in constraints and not re.match(constraints['regex'], value):
-                return f"Value doesn't match regex {constraints['regex']}"
+            if 'regex' in constraints:
+                if pattern is None:
+                    pattern = re.compile(constraints['regex'])
+                if not pattern.match(value):
+                    return f"Value doesn't match regex {constraints['regex']}"
         
         if 'enum' in constraints and value not in constraints['enum']:
             return f"Value {value} not in enum {constraints['enum']}"
@@ -375,7 +394,7 @@ class ValidationEngine:
             List of error dicts with 'field' and 'message'
         """
         errors = []
-        active_fields = [f for f in schema.fields if not f.is_deleted]
+        active_fields = schema.active_fields
         
         # Check required fields
         for field in active_fields:
@@ -386,8 +405,9 @@ class ValidationEngine:
                 })
         
         # Validate each value
+        fields_by_name = {f.field_name: f for f in active_fields}
         for field_name, value in values.items():
-            field = next((f for f in active_fields if f.field_name == field_name), None)
+            field = fields_by_name.get(field_name)
             
             if not field:
                 if not schema.allow_additional_fields:
@@ -419,7 +439,7 @@ class ValidationEngine:
                 float(value)
             elif field.field_type == 'boolean':
                 if not isinstance(value, bool):
-                    if isinstance(value, str) and value.lower() not in ('true', 'false', '0', '1', 'yes', 'no'):
+                    if isinstance(value, str) and value.lower() not in BOOLEAN_STRINGS:
                         return f"{field.field_name} must be a boolean"
         except (ValueError, TypeError):
             return f"{field.field_name} must be a valid {field.field_type}"
@@ -5,12 +5,14 @@ from .celery_app import celery
 from .extensions import db
 from .services.report_generator import ReportGenerator
 from .models import ReportExecution
+import logging
 import os
 
 
 # Initialize report generator
 REPORTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'instance', 'reports')
 report_gen = ReportGenerator(REPORTS_DIR)
+logger = logging.getLogger(__name__)
 
 
 @celery.task(name='generate_report_task')
@@ -32,5 +34,5 @@ def generate_report_task(template_id: int, format_type: str, user_id: int, param
         return execution.id
     except Exception as e:
         # Log error
-        print(f"Report generation failed: {e}")
+        logger.exception("Report generation failed: %s", e)
         raise
@@ -0,0 +1,137 @@
+import io
+import pytest
+from app.services.data_import_service import DataImportService
+
+
+@pytest.fixture()
+def service():
+    return DataImportService()
+
+
+@pytest.mark.parametrize("content, expected", [
+    ('[{"title": "a"}, {"title": "b"}]', "json"),
+    ('  {"title": "a"}\n', "json"),
+    ('{"title": "a"}\n{"title": "b"}\n', "jsonl"),
+    ('{\n  "title": "a"\n}\n', "json"),
+    ("title,width\nimg1,800\nimg2,640", "csv"),
+    ("title\twidth\nimg1\t800", "tsv"),
+    ("title|width\nimg1|800", "pipe"),
+    ("title;width\nimg1;800", "semicolon"),
+    ("title: img1\nwidth: 800\n---\ntitle: img2", "keyvalue"),
+    ("img1\nimg2\nimg3", "unknown"),
+])
+def test_detect_format(service, content, expected):
+    assert service.detect_format(content) == expected
+
+
+def test_detect_format_only_sniffs_head(service):
+    # Content past the sniff window must not change the result
+    content = "title,width\n" + "img,800\n" * 5000 + "{not json"
+    assert service.detect_format(content) == "csv"
+
+
+def test_detect_format_accepts_bytes(service):
+    content = ("title,width\n" + "img,800\n" * 5000).encode("utf-8")
+    assert service.detect_format(content) == "csv"
+    assert service.detect_format(memoryview(b'[{"title": "a"}]')) == "json"
+
+
+def test_auto_parse_csv(service):
+    fmt, data = service.auto_parse("title,width\nimg1,800\nimg2,640")
+    assert fmt == "csv"
+    assert data == [{"title": "img1", "width": "800"}, {"title": "img2", "width": "640"}]
+
+
+def test_parse_file_streams_csv_with_bom(service):
+    fileobj = io.BytesIO("\ufefftitle,width\r\nimg1,800\r\n".encode("utf-8"))
+    fmt, data = service.parse_file(fileobj, "csv")
+    assert fmt == "csv"
+    assert data == [{"title": "img1", "width": "800"}]
+    # The caller's file object is left open
+    assert not fileobj.closed
+
+
+def test_validate_reports_missing_required_column_once(service):
+    fields = [{"field_name": "title", "field_type": "string", "is_required": True}]
+    valid, errors = service.validate_against_schema(service.parse_csv("name\n" + "a\n" * 500), fields)
+    assert valid == []
+    assert errors == ["Required column(s) missing from data: title"]
+    assert errors.invalid_count == 500
+    assert not errors.truncated
+
+
+def test_validate_checks_headerless_records_individually(service):
+    # JSON columns come from the first record only; it must not reject the rest
+    fields = [{"field_name": "title", "field_type": "string", "is_required": True}]
+    data = service.parse_json('[{"name": "a"}, {"title": "b"}, {"title": "c"}]')
+    valid, errors = service.validate_against_schema(data, fields)
+    assert valid == [{"title": "b"}, {"title": "c"}]
+    assert errors == ["Record 1: 'title' is required"]
+    assert errors.invalid_count == 1
+
+
+def test_validate_stops_at_max_errors(service):
+    fields = [{"field_name": "width", "field_type": "integer", "is_required": False}]
+    valid, errors = service.validate_against_schema([{"width": "wide"}] * 500, fields, max_errors=10)
+    assert len(errors) == 10
+    assert errors.truncated
+    assert errors.invalid_count == 10
+
+
+def test_parsed_rows_carry_columns(service):
+    data = service.parse_csv("title,width\n")
+    assert data == []
+    assert service.get_columns(data) == ("title", "width")
+
+
+def test_preview_file_counts_all_windows(service):
+    fileobj = io.BytesIO(("title,width\n" + "img,800\n" * 25).encode("utf-8"))
+    fmt, preview, count = service.preview_file(fileobj, "csv", preview_size=5)
+    assert fmt == "csv"
+    assert count == 25
+    assert len(preview) == 5
+    assert service.get_columns(preview) == ("title", "width")
+
+
+def test_validate_reads_through_field_mapping(service):
+    fields = [
+        {"field_name": "title", "field_type": "string", "is_required": True},
+        {"field_name": "width", "field_type": "integer", "is_required": False},
+    ]
+    data = service.parse_csv("Name,W\nimg1,800\n")
+    valid, errors = service.validate_against_schema(data, fields, field_mapping={"Name": "title", "W": "width"})
+    assert errors == []
+    assert valid == [{"title": "img1", "width": 800}]
+
+
+@pytest.mark.parametrize("content, expected_format, expected_count", [
+    ("title,width\n" + "img,800\n" * 3000, "csv", 3000),
+    ("title: a\nwidth: 1\n---\ntitle: b\n", "keyvalue", 2),
+    ('[{"title": "a"}, {"title": "b"}]', "json", 2),
+    ('{"title": "a"}\n{"title": "b"}\n{"title": "c"}\n', "jsonl", 3),
+])
+def test_preview_file_auto_detects_from_stream(service, content, expected_format, expected_count):
+    fmt, preview, count = service.preview_file(io.BytesIO(content.encode("utf-8")), "auto", preview_size=1)
+    assert fmt == expected_format
+    assert count == expected_count
+    assert len(preview) == 1
+
+
+def test_suggest_field_mapping_prefers_exact_then_case_then_substring(service):
+    fields = [{"field_name": name} for name in ("title", "Width", "camera_model")]
+    data = service.parse_csv("title,width,camera,other\na,1,b,c\n")
+    assert service.suggest_field_mapping(data, fields) == {
+        "title": "title",
+        "width": "Width",
+        "camera": "camera_model",
+    }
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("title,width\r\nimg1,800\r\nimg2,640", 2),
+    ('title,note\nimg1,"two\nlines"\nimg2,x\n', 2),
+    ("title\n\nimg1\n\nimg2\n", 2),
+])
+def test_preview_file_count_matches_csv_reader(service, content, expected):
+    _, _, count = service.preview_file(io.BytesIO(content.encode("utf-8")), "csv", preview_size=1)
+    assert count == expected